@@ -1,8 +1,13 @@
 import os
-import time
 import json
+import argparse
 import matplotlib.pyplot as plt
 
+from claves_ordenamiento import attribute_keys
+from medicion_tiempos import measure_algorithm
+from ordenamiento_vectorizado import bucket_sort_np, pigeonhole_sort_np, radix_sort_np
+from planificador_ordenamiento import run_benchmark_grid
+
 #############################################
 # FUNCIÓN PARA LEER DATOS LOCALES (JSON)
 #############################################
@@ -58,16 +63,12 @@ def process_attribute_data(data):
 def measure_time(algorithm, data):
     """
     Mide el tiempo de ejecución de un algoritmo de ordenamiento aplicado a los datos.
-    Retorna el tiempo en milisegundos.
+    Cada algoritmo corre en un proceso aparte con calentamiento, varias repeticiones
+    y un tiempo máximo (ver medicion_tiempos.py).
+    Retorna un diccionario con el estado ("ok", "timeout" o "error") y la mediana,
+    el IQR y el mínimo en milisegundos.
     """
-    try:
-        start_time = time.time()
-        _ = algorithm(data.copy())  # Se hace una copia para evitar modificar la lista original.
-        end_time = time.time()
-        return (end_time - start_time) * 1000  # Convertir a milisegundos
-    except Exception as e:
-        print(f"Error al ejecutar {algorithm.__name__}: {e}")
-        return 0
+    return measure_algorithm(algorithm, data)
 
 #############################################
 # IMPLEMENTACIÓN DE ALGORITMOS DE ORDENAMIENTO
@@ -312,11 +313,22 @@ def busrbu_sort(arr):
 # GENERACIÓN DE GRÁFICOS
 #############################################
 
-def plot_times(algorithms, times, variable, type_label):
+def plot_times(algorithms, results, variable, type_label):
+    """
+    Barras con la mediana de cada algoritmo y su rango intercuartílico. Los algoritmos
+    que superaron el tiempo máximo o fallaron se marcan explícitamente (no como 0 ms).
+    """
+    medians = [r["mediana_ms"] if r["estado"] == "ok" else 0 for r in results]
+    lower = [r["mediana_ms"] - r["q1_ms"] if r["estado"] == "ok" else 0 for r in results]
+    upper = [r["q3_ms"] - r["mediana_ms"] if r["estado"] == "ok" else 0 for r in results]
+
     plt.figure(figsize=(10, 6))
-    plt.bar(algorithms, times, color='skyblue')
+    plt.bar(algorithms, medians, yerr=[lower, upper], capsize=3, color='skyblue')
+    for i, result in enumerate(results):
+        if result["estado"] != "ok":
+            plt.text(i, 0, f' {result["estado"].upper()}', rotation=90, ha='center', va='bottom', color='red', fontsize=9)
     plt.xlabel('Algoritmos de Ordenamiento')
-    plt.ylabel('Tiempo de ejecución (ms)')
+    plt.ylabel('Tiempo de ejecución, mediana e IQR (ms)')
     plt.title(f'Comparación de tiempos para {variable} ({type_label})')
     plt.xticks(rotation=45)
     plt.tight_layout()
@@ -338,6 +350,15 @@ def plot_times(algorithms, times, variable, type_label):
 #############################################
 
 def main():
+    parser = argparse.ArgumentParser(description="Comparación de algoritmos de ordenamiento sobre los atributos de los artículos.")
+    parser.add_argument("--curvas", action="store_true",
+                        help="Mide cada algoritmo en una serie geométrica de tamaños y ajusta n, n log n y n².")
+    parser.add_argument("--variable", default=None,
+                        help="Atributo cuyas claves se remuestrean para las curvas (por defecto, el primero).")
+    parser.add_argument("--presupuesto", type=float, default=None,
+                        help="Segundos por medición a partir de los cuales se deja de crecer el tamaño.")
+    args = parser.parse_args()
+
     # Leer el JSON desde la raíz del proyecto
     script_dir = os.path.dirname(os.path.abspath(__file__))
     json_filepath = os.path.join(script_dir, "processed_articles.json")
@@ -373,7 +394,7 @@ def main():
         'Year': [int(article.get("year", 0)) if str(article.get("year", "0")).isdigit() else 0 for article in articles_data],
     }
 
-    # Lista de algoritmos (15 en total: los 13 originales + 2 nuevos)
+    # Lista de algoritmos (15 en total: los 13 originales + 2 nuevos, más 3 versiones vectorizadas)
     algorithms_list = [
         'TimSort',
         'Comb Sort',
@@ -389,7 +410,11 @@ def main():
         'Radix Sort',
         'Bubble Sort',
         'Bidirectional Bubble Sort',
-        'Busrbu Sort'
+        'Busrbu Sort',
+        # Versiones vectorizadas con NumPy de los ordenamientos por distribución
+        'Pigeonhole Sort (NumPy)',
+        'Bucket Sort (NumPy)',
+        'Radix Sort (NumPy)'
     ]
 
     # Mapeo de nombres a funciones
@@ -408,22 +433,37 @@ def main():
         'Radix Sort': radix_sort,
         'Bubble Sort': bubble_sort,
         'Bidirectional Bubble Sort': bidirectional_bubble_sort,
-        'Busrbu Sort': busrbu_sort
+        'Busrbu Sort': busrbu_sort,
+        'Pigeonhole Sort (NumPy)': pigeonhole_sort_np,
+        'Bucket Sort (NumPy)': bucket_sort_np,
+        'Radix Sort (NumPy)': radix_sort_np
     }
 
+    # Claves tipadas (numéricas, códigos ordinales de texto), en caché según el hash del JSON
+    processed_variables = attribute_keys(variables, json_filepath)
     for variable, data in variables.items():
         print(f"\nAnalizando variable: {variable} con {len(data)} elementos")
         # Sin filtrar: se utiliza la lista completa extraída del JSON
-        working_data = data
-        processed_data, type_label = process_attribute_data(working_data)
+        processed_data, type_label = processed_variables[variable]
         print(f"Procesado para {variable} ({type_label}): {len(processed_data)} elementos")
-        times = []
-        for algo_name in algorithms_list:
-            function = algorithms_funcs[algo_name]
-            time_taken = measure_time(function, processed_data)
-            times.append(time_taken)
-            print(f"Tiempo de {algo_name} para {variable}: {time_taken:.4f} ms")
-        plot_times(algorithms_list, times, variable, type_label)
+
+    if args.curvas:
+        # Modo curvas de complejidad: entradas de tamaño creciente remuestreadas del atributo elegido
+        from curvas_complejidad import TIME_BUDGET, run_complexity_curves
+
+        variable = args.variable or next(iter(variables))
+        if variable not in processed_variables:
+            print(f"La variable {variable} no existe. Opciones: {', '.join(variables)}")
+            return
+        run_complexity_curves(algorithms_funcs, processed_variables[variable][0], budget=args.presupuesto or TIME_BUDGET)
+        print("Proceso completado.")
+        return
+
+    # Todos los pares (algoritmo, variable) se miden en paralelo, un núcleo por proceso
+    grid = run_benchmark_grid(algorithms_funcs, processed_variables)
+    for variable, (_, type_label) in processed_variables.items():
+        results = [grid[variable][algo_name] for algo_name in algorithms_list]
+        plot_times(algorithms_list, results, variable, type_label)
 
     print("Proceso completado.")
 
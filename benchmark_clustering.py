@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from clustering_abstracts import (
+    EXACT_LIMIT,
+    compute_tfidf_matrix,
+    condensed_cosine_distances,
+    hierarchical_clustering_average,
+    hierarchical_clustering_ward,
+    plot_dendrogram,
+    preprocess_texts,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+#############################################
+# BENCHMARK DE ESCALABILIDAD DEL CLUSTERING
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [100, 1000, 10000]
+# Las etapas cuadráticas (distancias, linkage) se omiten por encima de este tamaño
+MAX_QUADRATIC_SIZE = 20000
+RESULTS_FILE = os.path.join(SCRIPT_DIR, "resultados", "benchmark_clustering.json")
+BASELINE_FILE = os.path.join(SCRIPT_DIR, "resultados", "benchmark_clustering_base.json")
+# Un aumento mayor a este porcentaje respecto a la base se reporta como regresión
+DEFAULT_TOLERANCE = 0.25
+
+
+def synthetic_abstracts(n, vocabulary_size=5000, mean_length=150, seed=0):
+    """
+    Genera n abstracts sintéticos con palabras de frecuencia tipo Zipf.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"term{i}" for i in range(vocabulary_size)])
+    weights = 1.0 / np.arange(1, vocabulary_size + 1)
+    weights /= weights.sum()
+    lengths = rng.poisson(mean_length, size=n) + 5
+    return [" ".join(rng.choice(vocabulary, size=length, p=weights)) + "." for length in lengths]
+
+
+def real_abstracts(n, seed=0):
+    """
+    Toma n abstracts de processed_articles.json. Si hay menos, se generan variantes
+    eliminando palabras al azar para no repetir documentos idénticos.
+    """
+    json_filepath = os.path.join(SCRIPT_DIR, "processed_articles.json")
+    with open(json_filepath, "r", encoding="utf-8") as f:
+        abstracts = [a.get("abstract", "") for a in json.load(f) if a.get("abstract", "").strip()]
+    if not abstracts:
+        raise ValueError("processed_articles.json no contiene abstracts.")
+    rng = np.random.default_rng(seed)
+    result = abstracts[:n]
+    while len(result) < n:
+        words = abstracts[len(result) % len(abstracts)].split()
+        keep = rng.random(len(words)) > 0.1
+        result.append(" ".join(w for w, k in zip(words, keep) if k))
+    return result
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS reporta bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(stage, function, records, traced):
+    if traced:
+        tracemalloc.reset_peak()
+        result = function()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        records.append({"etapa": stage, "tracemalloc_pico_mb": traced_peak / (1024 * 1024)})
+        return result
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    records.append({"etapa": stage, "segundos": elapsed, "rss_pico_mb": _peak_rss_mb()})
+    return result
+
+
+def run_stages(source, n, traced=False):
+    """
+    Ejecuta todas las etapas del pipeline para un conjunto de n abstracts.
+    Se llama en un proceso nuevo para que el pico de RSS corresponda sólo a este tamaño
+    (el RSS es el máximo acumulado del proceso hasta el final de cada etapa).
+    tracemalloc multiplica el tiempo de las etapas que asignan muchos objetos, así que
+    con traced=False se miden tiempo y RSS y con traced=True sólo el pico de tracemalloc.
+    """
+    abstracts = synthetic_abstracts(n) if source == "sintetico" else real_abstracts(n)
+    records = []
+    if traced:
+        tracemalloc.start()
+
+    def _stage(stage, function):
+        return _measure(stage, function, records, traced)
+
+    try:
+        processed = _stage("preprocesamiento", lambda: preprocess_texts(abstracts, n_jobs=1))
+        X = _stage("tfidf", lambda: compute_tfidf_matrix(processed))
+        if n <= MAX_QUADRATIC_SIZE:
+            dist_vector = _stage("distancias", lambda: condensed_cosine_distances(X))
+            linkage_average = _stage("linkage_average", lambda: hierarchical_clustering_average(dist_vector))
+            del dist_vector
+            _stage("linkage_ward", lambda: hierarchical_clustering_ward(X))
+            labels = [f"doc {i}" for i in range(n)]
+            with tempfile.TemporaryDirectory() as folder:
+                _stage("dendrograma", lambda: plot_dendrogram(linkage_average, labels, "Benchmark", os.path.join(folder, "d.png")))
+        else:
+            for stage in ("distancias", "linkage_average", "linkage_ward", "dendrograma"):
+                records.append({"etapa": stage, "omitido": True})
+    finally:
+        if traced:
+            tracemalloc.stop()
+    for record in records:
+        record.update(fuente=source, n=n)
+    return records
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compara tiempo y memoria de cada (fuente, n, etapa) con la base guardada.
+    Retorna la lista de regresiones encontradas.
+    """
+    reference = {(r["fuente"], r["n"], r["etapa"]): r for r in baseline["resultados"] if not r.get("omitido")}
+    regressions = []
+    for record in results:
+        base = reference.get((record["fuente"], record["n"], record["etapa"]))
+        if base is None or record.get("omitido"):
+            continue
+        for metric in ("segundos", "rss_pico_mb", "tracemalloc_pico_mb"):
+            if not base.get(metric) or record.get(metric) is None:
+                continue
+            ratio = record[metric] / base[metric]
+            record[f"{metric}_vs_base"] = ratio
+            if ratio > 1 + tolerance:
+                regressions.append((record["fuente"], record["n"], record["etapa"], metric, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidad del clustering de abstracts.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--fuentes", nargs="+", choices=["sintetico", "real"], default=["sintetico"])
+    parser.add_argument("--tolerancia", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda estos resultados como nueva base.")
+    args = parser.parse_args()
+
+    results = []
+    for source in args.fuentes:
+        for n in args.tamanos:
+            print(f"Ejecutando benchmark: fuente={source}, n={n}")
+            # Dos procesos nuevos: uno sin trazar (tiempo, RSS) y otro con tracemalloc
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                records = executor.submit(run_stages, source, n).result()
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                traced = executor.submit(run_stages, source, n, True).result()
+            for record, traced_record in zip(records, traced):
+                record.update(traced_record)
+            for record in records:
+                if record.get("omitido"):
+                    print(f"  {record['etapa']:<18} omitido (n > {MAX_QUADRATIC_SIZE})")
+                else:
+                    print(f"  {record['etapa']:<18} {record['segundos']:10.3f} s  "
+                          f"RSS {record['rss_pico_mb'] or 0:9.1f} MB  tracemalloc {record['tracemalloc_pico_mb']:9.1f} MB")
+            results.extend(records)
+
+    regressions = []
+    if os.path.exists(BASELINE_FILE) and not args.guardar_base:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerancia)
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    report = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "limite_exacto": EXACT_LIMIT,
+        "resultados": results,
+        "regresiones": [
+            {"fuente": s, "n": n, "etapa": e, "metrica": m, "razon": r} for s, n, e, m, r in regressions
+        ],
+    }
+    with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en: {RESULTS_FILE}")
+
+    if args.guardar_base:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Base guardada en: {BASELINE_FILE}")
+
+    for source, n, stage, metric, ratio in regressions:
+        print(f"REGRESIÓN: {source} n={n} {stage} {metric} x{ratio:.2f} respecto a la base")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import os
+import json
+import hashlib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from clustering_abstracts import preprocess_texts
+
+#############################################
+# CACHÉ PERSISTENTE DE CARACTERÍSTICAS TF-IDF
+#############################################
+
+# Número máximo de documentos guardados en la caché (se expulsan los menos usados)
+DEFAULT_MAX_DOCUMENTS = 200000
+
+
+def abstract_hash(text):
+    """
+    Clave de la caché: hash SHA-1 del abstract original (sin preprocesar).
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path, write_func):
+    tmp_path = path + ".tmp"
+    write_func(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class TfidfFeatureCache:
+    """
+    Almacén en disco de los conteos de términos de cada abstract, indexados por el
+    hash del texto original, junto con el vocabulario y el IDF del último ajuste.
+    Sólo los abstracts que no están en la caché se preprocesan y tokenizan; el IDF
+    se recalcula a partir de los conteos, lo que equivale a reajustar
+    TfidfVectorizer(stop_words='english') sobre el corpus completo.
+    """
+
+    def __init__(self, folder, max_documents=DEFAULT_MAX_DOCUMENTS):
+        self.folder = folder
+        self.max_documents = max_documents
+        self.vocab_path = os.path.join(folder, "vocabulario.json")
+        self.index_path = os.path.join(folder, "indice.json")
+        self.matrix_path = os.path.join(folder, "documentos.npz")
+        self.analyzer = TfidfVectorizer(stop_words="english").build_analyzer()
+        self.feature_names_ = []
+        self.feature_idf_ = np.zeros(0, dtype=np.float32)
+        self._load()
+
+    def _load(self):
+        if all(os.path.exists(p) for p in (self.vocab_path, self.index_path, self.matrix_path)):
+            with open(self.vocab_path, "r", encoding="utf-8") as f:
+                self.terms = json.load(f)
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            stored = np.load(self.matrix_path)
+            self.counts = sparse.csr_matrix(
+                (stored["data"], stored["indices"], stored["indptr"]),
+                shape=tuple(stored["shape"]),
+            )
+            self.idf = stored["idf"]
+            self.hashes = index["hashes"]
+            self.last_used = index["last_used"]
+            self.clock = index["clock"]
+        else:
+            self.terms = []
+            self.counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+            self.idf = np.zeros(0, dtype=np.float32)
+            self.hashes = []
+            self.last_used = []
+            self.clock = 0
+        self.vocabulary = {term: idx for idx, term in enumerate(self.terms)}
+        self.rows = {h: idx for idx, h in enumerate(self.hashes)}
+
+    def save(self):
+        """
+        Guarda vocabulario, IDF, índice de hashes y conteos en la carpeta de la caché.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        def write_vocab(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.terms, f, ensure_ascii=False)
+
+        def write_index(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"hashes": self.hashes, "last_used": self.last_used, "clock": self.clock}, f)
+
+        def write_matrix(path):
+            with open(path, "wb") as f:
+                np.savez(
+                    f,
+                    data=self.counts.data,
+                    indices=self.counts.indices,
+                    indptr=self.counts.indptr,
+                    shape=np.array(self.counts.shape),
+                    idf=self.idf,
+                )
+
+        _atomic_write(self.vocab_path, write_vocab)
+        _atomic_write(self.matrix_path, write_matrix)
+        _atomic_write(self.index_path, write_index)
+
+    def _count_terms(self, texts):
+        """
+        Tokeniza los abstracts nuevos y construye su matriz de conteos,
+        ampliando el vocabulario con los términos que aún no existen.
+        """
+        indptr, indices, data = [0], [], []
+        for text in preprocess_texts(texts):
+            row_counts = {}
+            for token in self.analyzer(text):
+                col = self.vocabulary.get(token)
+                if col is None:
+                    col = len(self.terms)
+                    self.vocabulary[token] = col
+                    self.terms.append(token)
+                row_counts[col] = row_counts.get(col, 0) + 1
+            indices.extend(row_counts.keys())
+            data.extend(row_counts.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(texts), len(self.terms)),
+        )
+
+    def _evict(self, keep):
+        """
+        Expulsa los documentos usados hace más tiempo hasta respetar `max_documents`
+        (nunca los de la petición actual) y elimina del vocabulario los términos huérfanos.
+        """
+        excess = len(self.hashes) - self.max_documents
+        if excess <= 0:
+            return
+        candidates = [idx for idx in np.argsort(self.last_used, kind="stable") if self.hashes[idx] not in keep]
+        evicted = set(candidates[:excess])
+        kept_rows = np.array([idx for idx in range(len(self.hashes)) if idx not in evicted], dtype=np.int64)
+
+        counts = self.counts[kept_rows]
+        used_cols = np.flatnonzero(counts.getnnz(axis=0))
+        self.counts = counts[:, used_cols].tocsr()
+        self.terms = [self.terms[col] for col in used_cols]
+        self.idf = np.zeros(len(used_cols), dtype=np.float32)
+        self.hashes = [self.hashes[idx] for idx in kept_rows]
+        self.last_used = [self.last_used[idx] for idx in kept_rows]
+        self.vocabulary = {term: idx for idx, term in enumerate(self.terms)}
+        self.rows = {h: idx for idx, h in enumerate(self.hashes)}
+        print(f"Caché TF-IDF: se expulsaron {len(evicted)} documentos.")
+
+    def transform(self, abstracts, max_features=None):
+        """
+        Retorna la matriz TF-IDF (float32, filas normalizadas L2) de los abstracts dados,
+        vectorizando únicamente los que no estaban en la caché. Con `max_features` se
+        conservan los términos más frecuentes del corpus, como en TfidfVectorizer.
+        Los términos y el IDF de cada columna quedan en `self.feature_names_` y `self.feature_idf_`.
+        """
+        self.clock += 1
+        hashes = [abstract_hash(text) for text in abstracts]
+
+        new_texts, new_hashes = [], []
+        for text, h in zip(abstracts, hashes):
+            if h not in self.rows:
+                self.rows[h] = len(self.hashes) + len(new_hashes)
+                new_texts.append(text)
+                new_hashes.append(h)
+        print(f"Caché TF-IDF: {len(abstracts) - len(new_texts)} abstracts reutilizados, {len(new_texts)} nuevos.")
+
+        if new_texts:
+            new_counts = self._count_terms(new_texts)
+            old_counts = self.counts.copy()
+            old_counts.resize((old_counts.shape[0], len(self.terms)))
+            self.counts = sparse.vstack([old_counts, new_counts], format="csr")
+            self.hashes.extend(new_hashes)
+            self.last_used.extend([self.clock] * len(new_hashes))
+
+        for h in set(hashes):
+            self.last_used[self.rows[h]] = self.clock
+        self._evict(set(hashes))
+
+        counts = self.counts[[self.rows[h] for h in hashes]].astype(np.float32)
+        df = np.asarray((counts > 0).sum(axis=0)).ravel()
+        columns = np.flatnonzero(df)
+        if max_features is not None and len(columns) > max_features:
+            term_freq = np.asarray(counts.sum(axis=0)).ravel()[columns]
+            columns = np.sort(columns[np.argsort(-term_freq, kind="stable")[:max_features]])
+
+        # IDF suavizado, igual que TfidfVectorizer: ln((1 + n) / (1 + df)) + 1
+        n_docs = counts.shape[0]
+        idf = (np.log((1.0 + n_docs) / (1.0 + df[columns])) + 1.0).astype(np.float32)
+        self.idf = np.zeros(len(self.terms), dtype=np.float32)
+        self.idf[columns] = idf
+        self.feature_names_ = [self.terms[col] for col in columns]
+        self.feature_idf_ = idf
+
+        X = counts[:, columns] @ sparse.diags(idf)
+        X = normalize(X.tocsr()).astype(np.float32)
+        self.save()
+        return X
@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+#############################################
+# CLAVES DE ORDENAMIENTO TIPADAS Y EN CACHÉ
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+KEYS_CACHE_FOLDER = os.path.join(SCRIPT_DIR, "cache", "claves")
+# Claves de texto: "ordinal" (código del valor en el orden lexicográfico, exacto) o
+# "prefijo" (primeros 8 bytes UTF-8 como entero big-endian, sin ordenar, empates posibles)
+DEFAULT_STRING_KEYS = "ordinal"
+PREFIX_BYTES = 8
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Hash SHA-1 del contenido del archivo, leído por bloques.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _as_strings(data):
+    # Valores no textuales (listas, None, números mezclados con texto) se convierten uno a uno
+    return np.array(["" if x is None else str(x) for x in data], dtype=str)
+
+
+def prefix_keys(strings):
+    """
+    Primeros PREFIX_BYTES bytes UTF-8 de cada texto como uint64 big-endian: el orden de
+    las claves es el orden lexicográfico de los prefijos.
+    """
+    encoded = np.char.encode(strings, "utf-8").astype(f"S{PREFIX_BYTES}")
+    return encoded.view(">u8").astype(np.uint64)
+
+
+def attribute_keys_array(data, string_keys=DEFAULT_STRING_KEYS):
+    """
+    Convierte los valores de un atributo en un arreglo NumPy tipado en una pasada:
+    - numéricos (o textos que todos representan números): float64, etiqueta "Original";
+    - textos: códigos ordinales (np.unique) que conservan el orden de los textos,
+      etiqueta "Ordinal", o prefijos de bytes, etiqueta "Prefijo8".
+    A diferencia de la suma ASCII, textos distintos no colisionan y el orden se conserva.
+    Retorna (claves, etiqueta).
+    """
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.float64), "Sin datos"
+    try:
+        values = np.asarray(data)
+    except ValueError:  # listas de distinto largo (p. ej. keywords)
+        values = None
+    if values is not None and values.ndim == 1 and values.dtype.kind in "iuf":
+        return values.astype(np.float64), "Original"
+    strings = values if values is not None and values.ndim == 1 and values.dtype.kind == "U" else _as_strings(data)
+    try:
+        return strings.astype(np.float64), "Original"
+    except ValueError:
+        pass
+    if string_keys == "prefijo":
+        return prefix_keys(strings), f"Prefijo{PREFIX_BYTES}"
+    if string_keys != "ordinal":
+        raise ValueError(f"Tipo de clave no soportado: {string_keys}")
+    _, codes = np.unique(strings, return_inverse=True)
+    return codes.astype(np.int64).ravel(), "Ordinal"
+
+
+def attribute_keys(variables, json_filepath, string_keys=DEFAULT_STRING_KEYS, folder=KEYS_CACHE_FOLDER):
+    """
+    Claves de ordenamiento de cada variable (nombre -> valores extraídos del JSON).
+    Los arreglos se guardan en disco con el hash del archivo de entrada como clave, así
+    que mientras processed_articles.json no cambie no se vuelven a calcular. Al agregar
+    variables nuevas se conservan las ya guardadas (los dos scripts comparten el archivo).
+    Retorna nombre -> (claves, etiqueta).
+    """
+    cache_file = os.path.join(folder, f"{file_hash(json_filepath)}_{string_keys}.npz")
+    cached, labels = {}, {}
+    if os.path.exists(cache_file):
+        with np.load(cache_file) as stored:
+            labels = json.loads(str(stored["etiquetas"]))
+            cached = {name: stored[f"v{i}"] for i, name in enumerate(labels)}
+
+    missing = [name for name in variables if name not in cached]
+    for name in missing:
+        cached[name], labels[name] = attribute_keys_array(variables[name], string_keys)
+
+    if missing:
+        os.makedirs(folder, exist_ok=True)
+        names = list(cached)
+        arrays = {f"v{i}": cached[name] for i, name in enumerate(names)}
+        tmp_file = cache_file + ".tmp.npz"
+        np.savez(tmp_file, etiquetas=json.dumps({name: labels[name] for name in names}, ensure_ascii=False), **arrays)
+        os.replace(tmp_file, cache_file)
+    else:
+        print(f"Claves de ordenamiento leídas de la caché: {cache_file}")
+    return {name: (cached[name], labels[name]) for name in variables}
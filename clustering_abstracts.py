@@ -1,69 +1,364 @@
 import os
 import json
-import re
 import string
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_hex
+from xml.sax.saxutils import escape
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.decomposition import TruncatedSVD
+from sklearn.random_projection import SparseRandomProjection
+from sklearn.preprocessing import normalize
 from scipy.cluster.hierarchy import dendrogram, linkage
 
+# Por encima de este número de abstracts se usa el clustering en dos niveles
+EXACT_LIMIT = 2000
+# Tamaño máximo del vocabulario TF-IDF en modo escalable
+SCALABLE_MAX_FEATURES = 2 ** 15
+# Motor de linkage: "scipy" (en memoria) o "nn_chain" (distancias en disco con numpy.memmap)
+LINKAGE_ENGINE = "scipy"
+# Modo incremental: inserta los abstracts nuevos en el árbol persistido en lugar de recalcularlo
+INCREMENTAL_MODE = False
+# Guardar el índice de similitud top-k construido con los mismos vectores TF-IDF
+BUILD_SIMILARITY_INDEX = True
+# Agrupar abstracts casi idénticos (MinHash + LSH) antes del paso cuadrático
+DEDUPLICATE_ABSTRACTS = True
+# Modo streaming: lectura perezosa del JSON y vectorización con hashing en lotes
+STREAMING_MODE = False
+# Etiquetar los clusters con sus términos TF-IDF más discriminativos (dendrogramas y asignaciones)
+LABEL_CLUSTERS = True
+# Exportar cada árbol en formato binario con acceso aleatorio y en Newick (exportar_arbol.py)
+EXPORT_TREES = True
+# Métricas de calidad (cofenética, silhouette, Davies–Bouldin) por método y corte
+COMPUTE_METRICS = True
+# Consulta booleana del índice invertido (indice_invertido.py) para filtrar el corpus; None = todos
+SEARCH_QUERY = None
+# Métodos de linkage calculados en el modo exacto (uno por proceso)
+LINKAGE_METHODS = ["average", "complete", "ward"]
+# Cortes del árbol exportados como asignaciones de clusters (umbrales de distancia y número de clusters)
+CUT_THRESHOLDS = [0.5, 0.7, 0.9]
+CUT_N_CLUSTERS = [5, 10, 20]
+# Tamaño de los lotes de abstracts enviados a cada proceso al normalizar texto
+PREPROCESS_CHUNK_SIZE = 2048
+# Dimensiones densas a las que se proyecta TF-IDF antes de Ward ("svd" o "random")
+WARD_COMPONENTS = 100
+WARD_PROJECTION = "svd"
+# Número máximo de hojas dibujadas: por encima se muestran sólo las últimas uniones
+DENDROGRAM_MAX_LEAVES = 150
+
+# Tabla de traducción precompilada: cada signo de puntuación se reemplaza por un espacio
+PUNCTUATION_TABLE = str.maketrans(string.punctuation, " " * len(string.punctuation))
+
 
 def preprocess_text(text):
     """
     Convierte el texto a minúsculas, elimina signos de puntuación y espacios redundantes.
     """
-    text = text.lower()
-    text = re.sub(r'[' + re.escape(string.punctuation) + ']', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    return " ".join(text.lower().translate(PUNCTUATION_TABLE).split())
+
+
+def _preprocess_chunk(texts):
+    return [preprocess_text(text) for text in texts]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def preprocess_texts(texts, n_jobs=None, chunksize=PREPROCESS_CHUNK_SIZE):
+    """
+    Normaliza un iterable de abstracts repartiendo lotes entre un pool de procesos.
+    El resultado conserva el orden de entrada. Con n_jobs=1 (o pocos textos) se
+    procesa en el proceso actual para no pagar el arranque del pool.
+    """
+    texts = list(texts)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(texts) <= chunksize:
+        return _preprocess_chunk(texts)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        processed = []
+        for chunk in executor.map(_preprocess_chunk, _chunks(texts, chunksize)):
+            processed.extend(chunk)
+    return processed
+
+
+def compute_tfidf_matrix(documents, max_features=None):
+    """
+    Convierte los abstracts a una matriz TF-IDF dispersa (float32).
+    Cada fila queda normalizada (norma L2), por lo que el producto punto entre
+    dos filas es directamente su similitud coseno.
+    """
+    vectorizer = TfidfVectorizer(stop_words='english', dtype=np.float32, max_features=max_features)
+    return vectorizer.fit_transform(documents)
+
+
+def condensed_size(n):
+    """
+    Número de pares distintos (i < j) entre n elementos: n(n-1)/2.
+    """
+    return n * (n - 1) // 2
+
+
+def condensed_offset(n, i):
+    """
+    Posición dentro del vector condensado donde empiezan las distancias de la
+    fila i contra las columnas j > i (mismo orden que scipy.spatial.distance.pdist).
+    """
+    return i * n - i * (i + 1) // 2
+
+
+def fill_condensed_rows(X, start, stop, out, n=None):
+    """
+    Calcula las distancias coseno (1 - similitud) de las filas [start, stop)
+    contra las filas posteriores y las escribe en el vector condensado `out`.
+    Sólo se materializa un bloque denso de (stop - start) x (n - start).
+    X puede ser dispersa o densa (por ejemplo, centroides de micro-clusters).
+    """
+    n = X.shape[0] if n is None else n
+    similarity = X[start:stop] @ X[start:].T
+    if sparse.issparse(similarity):
+        similarity = similarity.toarray()
+    for i in range(start, stop):
+        local = i - start
+        row = 1.0 - similarity[local, local + 1:]
+        np.clip(row, 0.0, 2.0, out=row)
+        offset = condensed_offset(n, i)
+        out[offset:offset + n - i - 1] = row
+
+
+def condensed_cosine_distances(X, out=None, block_rows=None):
+    """
+    Calcula el vector condensado de distancias coseno (n(n-1)/2, float32)
+    directamente desde la matriz TF-IDF dispersa, procesando bloques de filas
+    para no construir nunca la matriz n x n.
+    Si se pasa `out` (por ejemplo un numpy.memmap) se escribe sobre él.
+    """
+    n = X.shape[0]
+    if out is None:
+        out = np.empty(condensed_size(n), dtype=np.float32)
+    if block_rows is None:
+        # Bloques de ~32M de elementos como máximo
+        block_rows = max(1, min(256, (1 << 25) // max(n, 1)))
+    for start in range(0, n, block_rows):
+        fill_condensed_rows(X, start, min(start + block_rows, n), out, n)
+    return out
 
 
 def compute_distance_matrix(documents):
     """
-    Convierte los abstracts a una matriz TF-IDF y calcula la matriz de distancia
-    usando similitud coseno (1 - similitud).
+    Convierte los abstracts a una matriz TF-IDF y calcula la distancia coseno
+    (1 - similitud) en forma condensada, lista para `linkage`.
     """
-    vectorizer = TfidfVectorizer(stop_words='english')
-    X = vectorizer.fit_transform(documents)
-    similarity = cosine_similarity(X)
-    distance = 1 - similarity
-    return distance
+    X = compute_tfidf_matrix(documents)
+    return condensed_cosine_distances(X)
 
 
-def hierarchical_clustering_average(dist_matrix):
+def hierarchical_clustering_average(dist_vector, engine="scipy"):
     """
     Agrupamiento jerárquico con Average Linkage.
     Calcula la distancia promedio entre los elementos de dos clusters.
+    Recibe el vector condensado de distancias. Con engine="nn_chain" el vector
+    puede ser un numpy.memmap en disco (y se sobrescribe durante el cálculo).
+    """
+    if engine == "nn_chain":
+        from linkage_nn_chain import nn_chain_linkage
+        return nn_chain_linkage(dist_vector, method='average')
+    return linkage(dist_vector, method='average')
+
+def reduce_dimensions(X, n_components=WARD_COMPONENTS, projection=WARD_PROJECTION, random_state=0):
+    """
+    Proyecta la matriz TF-IDF a `n_components` dimensiones densas (SVD truncada o
+    proyección aleatoria dispersa) y normaliza cada fila (norma L2).
+    """
+    return fit_reduction(X, n_components, projection, random_state)[1]
+
+
+def fit_reduction(X, n_components=WARD_COMPONENTS, projection=WARD_PROJECTION, random_state=0):
+    """
+    Igual que reduce_dimensions, pero retorna también el reductor ajustado
+    (su `components_` permite proyectar filas nuevas sin volver a ajustarlo).
+    Retorna (reductor, vectores proyectados y normalizados).
     """
-    return linkage(dist_matrix, method='average')
+    n_components = max(1, min(n_components, X.shape[1] - 1, X.shape[0] - 1))
+    if projection == "svd":
+        reducer = TruncatedSVD(n_components=n_components, random_state=random_state)
+    elif projection == "random":
+        reducer = SparseRandomProjection(n_components=n_components, random_state=random_state)
+    else:
+        raise ValueError(f"Proyección no soportada: {projection}")
+    Y = reducer.fit_transform(X)
+    if sparse.issparse(Y):
+        Y = Y.toarray()
+    return reducer, normalize(Y).astype(np.float32)
+
+
+def ward_linkage_vectors(Y, weights=None, engine=None):
+    """
+    Ward sobre vectores densos (geometría euclidiana). Con pocos vectores se usa scipy;
+    con muchos (o si hay pesos) el nearest-neighbor chain en memoria O(n·k).
+    """
+    if engine is None:
+        engine = "scipy" if weights is None and Y.shape[0] <= EXACT_LIMIT else "nn_chain"
+    if engine == "nn_chain":
+        from linkage_nn_chain import ward_nn_chain_vectors
+        return ward_nn_chain_vectors(Y, weights)
+    return linkage(Y, method='ward')
+
 
-def hierarchical_clustering_ward(dist_matrix):
+def hierarchical_clustering_ward(X, weights=None, engine=None, n_components=WARD_COMPONENTS, projection=WARD_PROJECTION):
     """
     Agrupamiento jerárquico con Ward Linkage.
     Minimiza la varianza dentro de los clusters.
+    Ward supone geometría euclidiana, así que en lugar de la distancia coseno se usa
+    la matriz TF-IDF proyectada a pocas dimensiones densas y normalizada (en vectores
+    unitarios la distancia euclidiana es monótona con la coseno).
     """
-    return linkage(dist_matrix, method='ward')
+    Y = reduce_dimensions(X, n_components, projection)
+    return ward_linkage_vectors(Y, weights, engine)
 
 
-def plot_dendrogram(linkage_matrix, labels, title, filename):
+def article_label(article, max_chars=40):
     """
-    Genera y guarda un dendrograma en formato PNG con mejor diseño y etiquetas de texto.
+    Etiqueta corta de un artículo para el dendrograma: título recortado o, si no hay, su DOI.
     """
-    plt.figure(figsize=(20, 12))
-    color_thresh = 0.6 * np.max(linkage_matrix[:, 2])  # Umbral de colores
+    title = str(article.get("title", "")).strip()
+    if title and title != "Unknown":
+        return title if len(title) <= max_chars else title[:max_chars - 1] + "…"
+    return str(article.get("doi", "Sin ID"))
+
+
+def representative_leaves(linkage_matrix):
+    """
+    Para cada nodo (hojas y nodos internos) retorna una hoja representativa de su subárbol.
+    """
+    n = linkage_matrix.shape[0] + 1
+    representative = np.arange(2 * n - 1)
+    for i, (a, b) in enumerate(linkage_matrix[:, :2].astype(np.int64)):
+        representative[n + i] = representative[a]
+    return representative
+
+
+def contracted_label_func(linkage_matrix, labels, node_labels=None):
+    """
+    Función de etiquetas para dendrogramas truncados: las hojas originales usan su
+    etiqueta y los nodos contraídos muestran su tamaño y sus términos (`node_labels`,
+    ver etiquetado_clusters.py) o, si no hay, la etiqueta de un representante.
+    """
+    n = linkage_matrix.shape[0] + 1
+    representative = representative_leaves(linkage_matrix)
+
+    def label(node_id):
+        if node_id < n:
+            return labels[node_id]
+        size = int(linkage_matrix[node_id - n, 3])
+        if node_labels is not None and node_labels[node_id]:
+            return f"({size}) {node_labels[node_id]}"
+        return f"({size}) {labels[representative[node_id]]}"
+
+    return label
 
-    dendrogram(
-        linkage_matrix,
-        labels=labels,  # Usamos los textos preprocesados de los abstracts como etiquetas
+
+def node_positions(linkage_matrix, dendrogram_info):
+    """
+    Coordenadas (x, altura) de cada nodo interno dibujado, en el sistema de la salida
+    de scipy `dendrogram` (hojas en 5, 15, 25...; cada unión en el punto medio de sus hijos).
+    """
+    n = linkage_matrix.shape[0] + 1
+    x = {int(leaf): 5.0 + 10.0 * i for i, leaf in enumerate(dendrogram_info["leaves"])}
+    positions = {}
+    for i, (a, b) in enumerate(linkage_matrix[:, :2].astype(np.int64)):
+        if a in x and b in x:
+            x[n + i] = (x[a] + x[b]) / 2
+            positions[n + i] = (x[n + i], float(linkage_matrix[i, 2]))
+    return positions
+
+
+def write_dendrogram_svg(dendrogram_info, title, filename, width=1600, height=900, margin=60, label_space=260, annotations=()):
+    """
+    Escribe el dendrograma (salida de scipy `dendrogram(no_plot=True)`) como SVG, un
+    elemento a la vez, sin construir la figura de matplotlib en memoria.
+    `annotations` es una lista de (x, altura, texto) dibujados sobre las uniones.
+    """
+    icoord = dendrogram_info["icoord"]
+    dcoord = dendrogram_info["dcoord"]
+    leaves = dendrogram_info["ivl"]
+    max_x = max(10.0 * len(leaves), 1.0)
+    max_y = max((max(d) for d in dcoord), default=1.0) or 1.0
+    plot_width = width - 2 * margin
+    plot_height = height - 2 * margin - label_space
+
+    def px(x):
+        return margin + plot_width * x / max_x
+
+    def py(y):
+        return margin + plot_height * (1.0 - y / max_y)
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif">\n')
+        f.write(f'<text x="{width / 2}" y="{margin / 2}" text-anchor="middle" font-size="20" font-weight="bold">{escape(title)}</text>\n')
+        for xs, ys, color in zip(icoord, dcoord, dendrogram_info["color_list"]):
+            points = " L ".join(f"{px(x):.1f} {py(y):.1f}" for x, y in zip(xs, ys))
+            f.write(f'<path d="M {points}" fill="none" stroke="{to_hex(color)}" stroke-width="1"/>\n')
+        for x, y, text in annotations:
+            f.write(f'<text x="{px(x):.1f}" y="{py(y) - 3:.1f}" text-anchor="middle" font-size="8" fill="#444">{escape(text)}</text>\n')
+        base = py(0)
+        for i, leaf in enumerate(leaves):
+            x = px(5.0 + 10.0 * i)
+            f.write(f'<text x="{x:.1f}" y="{base + 8:.1f}" font-size="9" transform="rotate(90 {x:.1f} {base + 8:.1f})">{escape(str(leaf))}</text>\n')
+        f.write("</svg>\n")
+
+
+def plot_dendrogram(linkage_matrix, labels, title, filename, max_leaves=DENDROGRAM_MAX_LEAVES, node_annotations=None, node_labels=None):
+    """
+    Genera y guarda un dendrograma (PNG, o SVG si el archivo termina en .svg).
+    Si el árbol tiene más de `max_leaves` hojas se dibujan sólo las últimas
+    `max_leaves` uniones; cada nodo contraído se etiqueta con su tamaño y un
+    título/ID representativo (o sus términos, si se pasan `node_labels` para los 2n-1
+    nodos). Así el costo de dibujo no depende del tamaño del corpus.
+    `node_annotations` (id de nodo -> texto) se escribe sobre las uniones dibujadas.
+    """
+    n_leaves = linkage_matrix.shape[0] + 1
+    color_thresh = 0.6 * np.max(linkage_matrix[:, 2])  # Umbral de colores
+    options = dict(
+        leaf_label_func=contracted_label_func(linkage_matrix, labels, node_labels),
         leaf_rotation=90,  # Gira las etiquetas para mejor legibilidad
         leaf_font_size=10,  # Tamaño de fuente para que se vea claro
         color_threshold=color_thresh,
-        show_contracted=True,
     )
+    if n_leaves > max_leaves:
+        options.update(truncate_mode="lastp", p=max_leaves, show_contracted=True)
+    shown_leaves = min(n_leaves, max_leaves)
+
+    if filename.lower().endswith(".svg"):
+        info = dendrogram(linkage_matrix, no_plot=True, **options)
+        annotations = []
+        if node_annotations:
+            annotations = [
+                (x, y, node_annotations[node])
+                for node, (x, y) in node_positions(linkage_matrix, info).items()
+                if node in node_annotations
+            ]
+        write_dendrogram_svg(info, title, filename, width=max(1200, 12 * shown_leaves), annotations=annotations)
+        print(f"Dendrograma guardado en: {filename}")
+        return
+
+    plt.figure(figsize=(min(max(20, 0.15 * shown_leaves), 40), 12))
+    info = dendrogram(linkage_matrix, **options)
+    if node_annotations:
+        for node, (x, y) in node_positions(linkage_matrix, info).items():
+            if node in node_annotations:
+                plt.text(x, y, node_annotations[node], ha="center", va="bottom", fontsize=7, color="#444")
 
     plt.title(title, fontsize=18, fontweight='bold')
-    plt.xlabel("Abstracts (Preprocesados)", fontsize=14)
+    plt.xlabel("Artículos (tamaño del grupo) título", fontsize=14)
     plt.ylabel("Distancia", fontsize=14)
     plt.grid(axis='y', linestyle='--', alpha=0.6)
     plt.tight_layout()
@@ -72,6 +367,19 @@ def plot_dendrogram(linkage_matrix, labels, title, filename):
     plt.close()
 
 
+def save_leaf_assignments(articles, doc_to_leaf, filename):
+    """
+    Guarda en JSON la hoja (micro-cluster) del dendrograma asignada a cada artículo.
+    """
+    assignments = [
+        {"doi": article.get("doi", "Unknown"), "title": article.get("title", "Unknown"), "leaf": int(leaf)}
+        for article, leaf in zip(articles, doc_to_leaf)
+    ]
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(assignments, f, ensure_ascii=False, indent=2)
+    print(f"Asignación de documentos a hojas guardada en: {filename}")
+
+
 def main():
     # Leer el JSON generado
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -81,39 +389,175 @@ def main():
         print("No se encontró el archivo processed_articles.json.")
         return
     
-    with open(json_filepath, "r", encoding="utf-8") as f:
-        articles_data = json.load(f)
-    
-    print(f"Número total de artículos: {len(articles_data)}")
-    
-    # Extraer abstracts y preprocesar
-    abstracts = [article.get("abstract", "") for article in articles_data]
-    processed_abstracts = [preprocess_text(ab) for ab in abstracts if ab.strip()]
-
-    if not processed_abstracts:
-        print("No se encontraron abstracts válidos.")
-        return
-    
-    # Limitar a 100 abstracts
-    sample_limit = 100
-    if len(processed_abstracts) > sample_limit:
-        print(f"Se encontraron {len(processed_abstracts)} abstracts, se usarán solo los primeros {sample_limit}.")
-        processed_abstracts = processed_abstracts[:sample_limit]
-
-    # Calcular la matriz de distancia
-    dist_matrix = compute_distance_matrix(processed_abstracts)
-    
     # Crear carpeta de resultados si no existe
     results_folder = os.path.join(script_dir, "resultados")
     os.makedirs(results_folder, exist_ok=True)
 
-    # Clustering con Average Linkage
-    linkage_average = hierarchical_clustering_average(dist_matrix)
-    plot_dendrogram(linkage_average, processed_abstracts, "Dendrograma - Average Linkage", os.path.join(results_folder, "dendrogram_average.png"))
+    if STREAMING_MODE:
+        # Lectura perezosa del JSON y vectorización por lotes con hashing (memoria acotada)
+        from vectorizacion_streaming import fold_hashed_features, stream_hashing_tfidf
+
+        X, valid_articles = stream_hashing_tfidf(json_filepath)
+        # El hashing no conserva los términos: no se pueden etiquetar los clusters
+        feature_names = None
+        hashes = [article["hash"] for article in valid_articles]
+        scalable = LINKAGE_ENGINE == "scipy" and len(valid_articles) > EXACT_LIMIT
+        if scalable:
+            # Mini-Batch K-Means guarda centroides densos: se limita la dimensión como en el modo no streaming
+            X = fold_hashed_features(X, SCALABLE_MAX_FEATURES)
+    else:
+        with open(json_filepath, "r", encoding="utf-8") as f:
+            articles_data = json.load(f)
+
+        print(f"Número total de artículos: {len(articles_data)}")
+
+        # Extraer abstracts (se conservan los artículos con abstract)
+        valid_articles = [article for article in articles_data if article.get("abstract", "").strip()]
+        abstracts = [article["abstract"] for article in valid_articles]
+
+        # Vectorización TF-IDF reutilizando la caché en disco: sólo se procesan los abstracts nuevos
+        from cache_tfidf import TfidfFeatureCache, abstract_hash
+
+        hashes = [abstract_hash(ab) for ab in abstracts]
+        feature_cache = TfidfFeatureCache(os.path.join(script_dir, "cache", "tfidf"))
+        scalable = LINKAGE_ENGINE == "scipy" and len(abstracts) > EXACT_LIMIT
+        if abstracts:
+            X = feature_cache.transform(abstracts, max_features=SCALABLE_MAX_FEATURES if scalable else None)
+        feature_names = feature_cache.feature_names_
+
+        if abstracts and BUILD_SIMILARITY_INDEX:
+            # Índice persistente para consultas top-k de artículos similares (indice_similitud.py)
+            from indice_similitud import SimilarityIndex
+
+            dois = [article.get("doi", "Unknown") for article in valid_articles]
+            SimilarityIndex(X, feature_cache.feature_names_, feature_cache.feature_idf_, dois).save()
+
+        if SEARCH_QUERY:
+            # Filtrado con el índice invertido, actualizado sólo con los artículos nuevos. Se aplica
+            # después de vectorizar: el IDF y el índice de similitud cubren todo el corpus
+            from indice_invertido import InvertedIndex, article_key
+
+            search_index = InvertedIndex()
+            if search_index.add_articles(articles_data):
+                search_index.save()
+            matches = search_index.search_keys(SEARCH_QUERY)
+            selected = [i for i, article in enumerate(valid_articles) if article_key(article) in matches]
+            valid_articles = [valid_articles[i] for i in selected]
+            abstracts = [abstracts[i] for i in selected]
+            hashes = [hashes[i] for i in selected]
+            if abstracts:
+                X = X[selected]
+            print(f"Artículos que cumplen la consulta '{SEARCH_QUERY}': {len(valid_articles)}")
+            scalable = LINKAGE_ENGINE == "scipy" and len(abstracts) > EXACT_LIMIT
+
+    if len(valid_articles) < 2:
+        print("No se encontraron abstracts válidos.")
+        return
+    article_labels = [article_label(article) for article in valid_articles]
+
+    # Colapsar casi-duplicados (mismo artículo de varias fuentes): se agrupa un representante
+    # por grupo y las hojas muestran cuántos artículos representan
+    group_of_doc = np.arange(len(valid_articles))
+    if DEDUPLICATE_ABSTRACTS and not STREAMING_MODE:
+        from deduplicacion_minhash import near_duplicate_groups
+
+        representatives, group_of_doc, multiplicity = near_duplicate_groups(abstracts)
+        print(f"Casi-duplicados: {len(valid_articles)} abstracts agrupados en {len(representatives)} representantes.")
+        X = X[representatives]
+        hashes = [hashes[i] for i in representatives]
+        article_labels = [
+            article_labels[doc] if count == 1 else f"{article_labels[doc]} (×{count})"
+            for doc, count in zip(representatives, multiplicity)
+        ]
+        if len(representatives) < 2:
+            print("Todos los abstracts son casi-duplicados entre sí: no hay nada que agrupar.")
+            return
+
+    # Cada modo produce los linkages, la etiqueta de cada hoja y la hoja de cada representante
+    leaf_labels = article_labels
+    leaf_of_doc = np.arange(X.shape[0])
+
+    if LINKAGE_ENGINE == "nn_chain":
+        # Linkage exacto con las distancias en disco: limitado por el disco, no por la RAM
+        from linkage_nn_chain import memmap_linkage
+
+        linkages = {
+            "average": memmap_linkage(X, method="average", folder=results_folder),
+            "ward": hierarchical_clustering_ward(X, engine="nn_chain"),
+        }
+    elif scalable:
+        # Modo escalable: micro-clusters + linkage sobre sus centroides
+        from clustering_escalable import build_micro_clusters, cluster_centroids, micro_cluster_labels
+
+        print(f"Se encontraron {X.shape[0]} abstracts, se usará el modo escalable en dos niveles.")
+        centroids, leaf_of_doc, sizes = build_micro_clusters(X)
+        print(f"Documentos comprimidos en {len(sizes)} micro-clusters.")
+        leaf_labels = micro_cluster_labels(article_labels, leaf_of_doc, sizes)
+        save_leaf_assignments(valid_articles, leaf_of_doc[group_of_doc], os.path.join(results_folder, "asignacion_microclusters.json"))
+
+        linkages = {
+            "average": cluster_centroids(centroids, method="average"),
+            "ward": cluster_centroids(centroids, method="ward", sizes=sizes),
+        }
+    elif INCREMENTAL_MODE:
+        # Sólo los abstracts nuevos se insertan en los árboles persistidos
+        from clustering_incremental import incremental_linkage
+
+        incremental_folder = os.path.join(script_dir, "cache", "incremental")
+
+        linkage_average, leaf_rows = incremental_linkage(X, hashes, "average", incremental_folder)
+        linkage_ward, _ = incremental_linkage(X, hashes, "ward", incremental_folder, feature_names)
+        linkages = {"average": linkage_average, "ward": linkage_ward}
+        leaf_labels = [article_labels[row] for row in leaf_rows]
+        leaf_of_doc[leaf_rows] = np.arange(len(leaf_rows))
+    else:
+        # Una sola matriz de distancias compartida por todos los métodos, cada uno en su proceso
+        from clustering_multimetodo import run_linkage_methods
+
+        linkages = run_linkage_methods(X, LINKAGE_METHODS)
+
+    # Dendrogramas (en paralelo) y asignaciones de clusters planos junto al DOI de cada artículo
+    from clustering_multimetodo import render_dendrograms
+    from cortes_clusters import cut_linkage_multi, export_cluster_assignments
+
+    node_labels = {}
+    if LABEL_CLUSTERS and feature_names is not None:
+        # Términos de cada nodo a partir de los centroides dispersos, en una pasada por árbol
+        from etiquetado_clusters import label_tree_nodes
+
+        node_labels = {
+            method: label_tree_nodes(linkage_matrix, X, feature_names, leaf_of_doc)
+            for method, linkage_matrix in linkages.items()
+        }
+
+    render_dendrograms(linkages, leaf_labels, results_folder, node_labels=node_labels)
+    if EXPORT_TREES:
+        from exportar_arbol import export_tree, write_newick
+
+        for method, linkage_matrix in linkages.items():
+            export_tree(
+                linkage_matrix, leaf_labels, os.path.join(results_folder, f"arbol_{method}.arbol"),
+                node_labels=node_labels.get(method), metadata={"metodo": method},
+            )
+            write_newick(linkage_matrix, leaf_labels, os.path.join(results_folder, f"arbol_{method}.nwk"))
+    if COMPUTE_METRICS:
+        # Muestreo estratificado: el costo no crece cuadráticamente con el corpus
+        from metricas_clustering import evaluate_linkages, save_metrics
+
+        metrics = evaluate_linkages(X, linkages, leaf_of_doc, CUT_THRESHOLDS, CUT_N_CLUSTERS)
+        save_metrics(metrics, os.path.join(results_folder, "metricas_clustering.json"))
+
+    leaf_of_doc = leaf_of_doc[group_of_doc]
+    for method, linkage_matrix in linkages.items():
+        cuts, nodes = cut_linkage_multi(linkage_matrix, thresholds=CUT_THRESHOLDS, n_clusters=CUT_N_CLUSTERS, return_nodes=True)
+        cluster_labels = None
+        if method in node_labels:
+            from etiquetado_clusters import cut_cluster_labels
 
-    # Clustering con Ward Linkage (Nuevo método)
-    linkage_ward = hierarchical_clustering_ward(dist_matrix)
-    plot_dendrogram(linkage_ward, processed_abstracts, "Dendrograma - Ward Linkage", os.path.join(results_folder, "dendrogram_ward.png"))
+            cluster_labels = cut_cluster_labels(nodes, node_labels[method])
+        export_cluster_assignments(
+            os.path.join(results_folder, f"asignaciones_{method}.csv"), valid_articles, cuts, leaf_of_doc, cluster_labels
+        )
 
     print("Proceso de clustering y generación de dendrogramas completado.")
 
@@ -0,0 +1,81 @@
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import normalize
+
+from clustering_abstracts import (
+    condensed_cosine_distances,
+    hierarchical_clustering_average,
+    hierarchical_clustering_ward,
+)
+
+#############################################
+# CLUSTERING JERÁRQUICO EN DOS NIVELES
+#############################################
+
+# Número máximo de micro-clusters (hojas del dendrograma) en modo escalable
+DEFAULT_MICRO_CLUSTERS = 1000
+BATCH_SIZE = 4096
+
+
+def build_micro_clusters(X, n_clusters=DEFAULT_MICRO_CLUSTERS, batch_size=BATCH_SIZE, random_state=0):
+    """
+    Comprime los documentos en a lo sumo `n_clusters` micro-clusters con una
+    pasada de Mini-Batch K-Means sobre los vectores TF-IDF.
+    Retorna (centroides normalizados, hoja asignada a cada documento, tamaño de cada hoja).
+    Los micro-clusters que quedan vacíos se descartan y las hojas se renumeran.
+    """
+    n_docs = X.shape[0]
+    n_clusters = max(1, min(n_clusters, n_docs))
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_clusters,
+        batch_size=batch_size,
+        random_state=random_state,
+        n_init=1,
+    )
+    labels = kmeans.fit_predict(X)
+
+    sizes = np.bincount(labels, minlength=n_clusters)
+    used = np.flatnonzero(sizes)
+    remap = np.full(n_clusters, -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+
+    centroids = normalize(kmeans.cluster_centers_[used]).astype(np.float32)
+    return centroids, remap[labels], sizes[used]
+
+
+def cluster_centroids(centroids, method="average", sizes=None):
+    """
+    Aplica el linkage indicado ('average' o 'ward') sobre los centroides de los
+    micro-clusters. Cada hoja del dendrograma resultante es un micro-cluster.
+    Para Ward, `sizes` pondera cada centroide con el número de documentos que representa.
+    """
+    if centroids.shape[0] < 2:
+        raise ValueError("Se necesitan al menos dos micro-clusters para construir el dendrograma.")
+    if method == "average":
+        return hierarchical_clustering_average(condensed_cosine_distances(centroids))
+    if method == "ward":
+        return hierarchical_clustering_ward(centroids, weights=sizes)
+    raise ValueError(f"Método de linkage no soportado: {method}")
+
+
+def two_level_clustering(X, method="average", n_clusters=DEFAULT_MICRO_CLUSTERS, random_state=0):
+    """
+    Agrupamiento jerárquico escalable: primero se forman micro-clusters y luego
+    se aplica el linkage indicado sobre sus centroides.
+    Retorna (linkage_matrix, hoja de cada documento, tamaño de cada hoja).
+    """
+    centroids, doc_to_leaf, sizes = build_micro_clusters(X, n_clusters, random_state=random_state)
+    return cluster_centroids(centroids, method, sizes), doc_to_leaf, sizes
+
+
+def micro_cluster_labels(doc_labels, doc_to_leaf, sizes, max_chars=40):
+    """
+    Etiqueta cada hoja con su número de documentos y la etiqueta del primer documento asignado.
+    """
+    first_doc = {}
+    for idx, leaf in enumerate(doc_to_leaf):
+        first_doc.setdefault(int(leaf), idx)
+    return [
+        f"[{sizes[leaf]} docs] {doc_labels[first_doc[leaf]][:max_chars]}"
+        for leaf in range(len(sizes))
+    ]
@@ -0,0 +1,358 @@
+import os
+import json
+import numpy as np
+from collections import Counter
+
+from clustering_abstracts import (
+    condensed_cosine_distances,
+    fit_reduction,
+    hierarchical_clustering_average,
+    ward_linkage_vectors,
+)
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+#############################################
+# ACTUALIZACIÓN INCREMENTAL DEL DENDROGRAMA
+#############################################
+
+# Si los documentos insertados superan esta fracción del árbol base, se reconstruye
+MAX_INSERTED_FRACTION = 0.25
+# Si demasiadas inserciones suben hasta la raíz, el árbol ya no representa bien el corpus
+MAX_ROOT_ATTACH_FRACTION = 0.10
+# Si la distancia media (o el p95) de inserción supera esta proporción de la altura a la
+# que se unían las hojas del árbol base, los documentos nuevos ya no se parecen al corpus base
+MAX_ATTACH_DISTANCE_RATIO = 1.2
+
+
+def document_keys(hashes):
+    """
+    Claves estables de cada documento: hash del abstract más el número de aparición,
+    para distinguir abstracts repetidos dentro del corpus.
+    """
+    seen = Counter()
+    keys = []
+    for h in hashes:
+        keys.append(f"{h}:{seen[h]}")
+        seen[h] += 1
+    return keys
+
+
+def full_linkage(X, method):
+    """
+    Linkage completo (exacto) sobre la matriz TF-IDF.
+    Retorna (linkage, proyección) donde, para Ward, la proyección es
+    (componentes del reductor, vectores proyectados de cada hoja); para average, None.
+    """
+    if method == "average":
+        return hierarchical_clustering_average(condensed_cosine_distances(X)), None
+    if method == "ward":
+        # Igual que hierarchical_clustering_ward, conservando el reductor ajustado
+        reducer, Y = fit_reduction(X)
+        components = reducer.components_
+        if sparse.issparse(components):
+            components = components.toarray()
+        return ward_linkage_vectors(Y), (components.astype(np.float32), Y)
+    raise ValueError(f"Método de linkage no soportado: {method}")
+
+
+def leaf_merge_heights(linkage_matrix):
+    """
+    Altura a la que cada hoja se une por primera vez a otro nodo: la referencia con la
+    que se comparan las distancias de inserción.
+    """
+    n = linkage_matrix.shape[0] + 1
+    heights = linkage_matrix[:, 2]
+    return np.concatenate([heights[linkage_matrix[:, 0] < n], heights[linkage_matrix[:, 1] < n]])
+
+
+def project_rows(X, feature_names, terms, components):
+    """
+    Proyecta filas nuevas con la proyección persistida: las columnas de X se alinean por
+    término con el vocabulario del ajuste (los términos nuevos se descartan). Sin nombres
+    de columnas (hashing) las columnas ya son estables entre ejecuciones.
+    """
+    if feature_names is not None:
+        position = {term: col for col, term in enumerate(terms)}
+        pairs = [(col, position[term]) for col, term in enumerate(feature_names) if term in position]
+        rows = np.array([col for col, _ in pairs], dtype=np.int64)
+        cols = np.array([stored for _, stored in pairs], dtype=np.int64)
+        alignment = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(X.shape[1], len(terms)))
+        X = X @ alignment
+    Y = X @ components.T
+    return normalize(np.asarray(Y)).astype(np.float32)
+
+
+def load_state(folder, method):
+    """
+    Carga el árbol persistido (linkage, claves de las hojas y estadísticas de deriva).
+    Retorna None si no existe.
+    """
+    matrix_path = os.path.join(folder, f"{method}.npz")
+    stats_path = os.path.join(folder, f"{method}.json")
+    if not (os.path.exists(matrix_path) and os.path.exists(stats_path)):
+        return None
+    stored = np.load(matrix_path)
+    with open(stats_path, "r", encoding="utf-8") as f:
+        stats = json.load(f)
+    distances = stored["distancias"] if "distancias" in stored.files else np.zeros(0)
+    state = {"linkage": stored["linkage"], "keys": stored["keys"].tolist(), "distances": distances, "stats": stats}
+    if "proyeccion" in stored.files:
+        state["projection"] = (stored["proyeccion"], stored["vectores"], stored["terminos"].tolist())
+    return state
+
+
+def save_state(folder, method, state):
+    os.makedirs(folder, exist_ok=True)
+    arrays = {}
+    if state.get("projection") is not None:
+        components, vectors, terms = state["projection"]
+        arrays = {"proyeccion": components, "vectores": vectors, "terminos": np.array(terms, dtype=str)}
+    with open(os.path.join(folder, f"{method}.npz"), "wb") as f:
+        np.savez(f, linkage=state["linkage"], keys=np.array(state["keys"]), distancias=state["distances"], **arrays)
+    with open(os.path.join(folder, f"{method}.json"), "w", encoding="utf-8") as f:
+        json.dump(state["stats"], f, indent=2)
+
+
+def _tree_from_linkage(linkage_matrix, n_leaves, n_total):
+    """
+    Convierte una matriz de linkage en arreglos de hijos/padre/altura/tamaño con espacio
+    para `n_total` hojas. Los nodos internos existentes se renumeran a partir de n_total.
+    """
+    capacity = 2 * n_total - 1
+    left = np.full(capacity, -1, dtype=np.int64)
+    right = np.full(capacity, -1, dtype=np.int64)
+    parent = np.full(capacity, -1, dtype=np.int64)
+    height = np.zeros(capacity, dtype=np.float64)
+    count = np.ones(capacity, dtype=np.int64)
+
+    def remap(node):
+        return node if node < n_leaves else node - n_leaves + n_total
+
+    for i, (a, b, dist, size) in enumerate(linkage_matrix):
+        node = n_total + i
+        a, b = remap(int(a)), remap(int(b))
+        left[node], right[node] = a, b
+        parent[a] = parent[b] = node
+        height[node] = dist
+        count[node] = int(size)
+    return left, right, parent, height, count
+
+
+def _linkage_from_tree(left, right, height, count, root, n_total):
+    """
+    Reconstruye una matriz de linkage de scipy a partir de los arreglos del árbol:
+    los nodos internos se ordenan por altura (de forma estable sobre un recorrido
+    en post-orden, para que los hijos siempre precedan a sus padres).
+    """
+    postorder = []
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node < n_total:
+            continue
+        if expanded:
+            postorder.append(node)
+        else:
+            stack.append((node, True))
+            stack.append((right[node], False))
+            stack.append((left[node], False))
+    postorder = np.array(postorder, dtype=np.int64)
+    order = postorder[np.argsort(height[postorder], kind="mergesort")]
+
+    new_id = {int(node): n_total + rank for rank, node in enumerate(order)}
+    linkage_matrix = np.empty((n_total - 1, 4), dtype=np.float64)
+    for rank, node in enumerate(order):
+        a = int(left[node])
+        b = int(right[node])
+        a = a if a < n_total else new_id[a]
+        b = b if b < n_total else new_id[b]
+        linkage_matrix[rank] = (min(a, b), max(a, b), height[node], count[node])
+    return linkage_matrix
+
+
+def _subtree_sums(left, right, Y, n_total, n_internal):
+    """
+    Suma de los vectores de cada subárbol (los nodos internos se recorren en el orden
+    de creación, así que los hijos siempre se calculan antes que el padre).
+    """
+    sums = np.zeros((len(left), Y.shape[1]), dtype=np.float64)
+    sums[:Y.shape[0]] = Y
+    for node in range(n_total, n_total + n_internal):
+        sums[node] = sums[left[node]] + sums[right[node]]
+    return sums
+
+
+def insert_documents(linkage_matrix, X_old, X_new, Y_old=None, Y_new=None):
+    """
+    Inserta los documentos nuevos en un árbol existente. Cada documento se une a su hoja
+    más cercana y el nuevo nodo sube por los ancestros cuya altura es menor que la
+    distancia de inserción (re-unión local), preservando la monotonía.
+    Sin vectores reducidos la distancia es la coseno (árbol average). Con `Y_old`/`Y_new`
+    (árbol Ward) la distancia de unir el documento x a un subárbol C es el criterio de
+    Ward sobre los vectores proyectados, sqrt(2|C| / (|C| + 1)) · ||x - centroide(C)||,
+    en la misma escala que las alturas de scipy, y se recalcula en cada ancestro.
+    Retorna (nueva matriz de linkage, distancias de inserción, inserciones en la raíz).
+    """
+    n_old, n_new = X_old.shape[0], X_new.shape[0]
+    n_total = n_old + n_new
+    left, right, parent, height, count = _tree_from_linkage(linkage_matrix, n_old, n_total)
+    root = n_total + n_old - 2
+    next_internal = n_total + n_old - 1
+
+    ward = Y_old is not None
+    if ward:
+        Y = np.vstack([Y_old, Y_new]).astype(np.float64)
+        sums = _subtree_sums(left, right, Y, n_total, n_old - 1)
+
+        def attach_distance(node, x):
+            size = count[node]
+            return float(np.sqrt(2.0 * size / (size + 1)) * np.linalg.norm(x - sums[node] / size))
+    else:
+        # Similitudes contra las hojas antiguas y entre los documentos nuevos (dispersas)
+        sim_old = (X_old @ X_new.T).tocsc()
+        sim_new = (X_new @ X_new.T).toarray()
+
+    attach_distances = np.empty(n_new, dtype=np.float64)
+    root_attachments = 0
+    for j in range(n_new):
+        if ward:
+            # Vectores unitarios: la hoja más cercana en euclidiana es la de mayor producto punto
+            x = Y[n_old + j]
+            best_leaf = int(np.argmax(Y[:n_old + j] @ x))
+            node = best_leaf
+            distance = attach_distance(node, x)
+            while parent[node] != -1 and height[parent[node]] < distance:
+                node = parent[node]
+                distance = attach_distance(node, x)
+        else:
+            column = sim_old.getcol(j)
+            best_leaf, best_sim = 0, 0.0
+            if column.nnz:
+                k = int(np.argmax(column.data))
+                best_leaf, best_sim = int(column.indices[k]), float(column.data[k])
+            if j:
+                k = int(np.argmax(sim_new[j, :j]))
+                if sim_new[j, k] > best_sim:
+                    best_leaf, best_sim = n_old + k, float(sim_new[j, k])
+            distance = min(max(1.0 - best_sim, 0.0), 2.0)
+            node = best_leaf
+            while parent[node] != -1 and height[parent[node]] < distance:
+                node = parent[node]
+        attach_distances[j] = distance
+        leaf = n_old + j
+        merged = next_internal
+        next_internal += 1
+        old_parent = parent[node]
+        left[merged], right[merged] = node, leaf
+        height[merged] = max(distance, height[node])
+        count[merged] = count[node] + 1
+        parent[node] = parent[leaf] = merged
+        parent[merged] = old_parent
+        if old_parent == -1:
+            root = merged
+            root_attachments += 1
+        else:
+            if left[old_parent] == node:
+                left[old_parent] = merged
+            else:
+                right[old_parent] = merged
+            ancestor = old_parent
+            while ancestor != -1:
+                count[ancestor] += 1
+                if ward:
+                    sums[ancestor] += x
+                ancestor = parent[ancestor]
+        if ward:
+            sums[merged] = sums[node] + x
+
+    updated = _linkage_from_tree(left, right, height, count, root, n_total)
+    return updated, attach_distances, root_attachments
+
+
+def incremental_linkage(X, hashes, method, folder, feature_names=None):
+    """
+    Modo incremental: si existe un árbol persistido para `method`, inserta sólo los
+    documentos nuevos; si no existe, si se eliminaron documentos o si las estadísticas
+    de deriva lo recomiendan, recalcula el linkage completo.
+    Para Ward se persisten la proyección ajustada en la reconstrucción y los vectores de
+    las hojas: en cada inserción sólo se proyectan las filas nuevas (`feature_names`
+    alinea sus columnas con el vocabulario del ajuste).
+    Retorna (linkage_matrix, fila de X correspondiente a cada hoja).
+    """
+    keys = document_keys(hashes)
+    row_of = {key: row for row, key in enumerate(keys)}
+    state = load_state(folder, method)
+
+    rebuild = state is None or len(state["keys"]) < 2 or state["stats"].get("requiere_reconstruccion", False)
+    if not rebuild and method == "ward" and "projection" not in state:
+        rebuild = True
+    if not rebuild and any(key not in row_of for key in state["keys"]):
+        print(f"[{method}] Se eliminaron documentos del corpus: se reconstruye el árbol.")
+        rebuild = True
+
+    if rebuild:
+        print(f"[{method}] Calculando el linkage completo sobre {len(keys)} documentos.")
+        linkage_matrix, fitted = full_linkage(X, method)
+        projection = None if fitted is None else (fitted[0], fitted[1], list(feature_names or []))
+        leaf_keys = keys
+        all_distances = np.zeros(0)
+        base_heights = leaf_merge_heights(linkage_matrix)
+        stats = {
+            "documentos_base": len(keys),
+            "documentos_insertados": 0,
+            "inserciones_en_raiz": 0,
+            "distancia_media_base": float(base_heights.mean()),
+            "distancia_p95_base": float(np.percentile(base_heights, 95)),
+            "distancia_media_insercion": None,
+            "distancia_p95_insercion": None,
+            "requiere_reconstruccion": False,
+        }
+    else:
+        known = set(state["keys"])
+        new_keys = [key for key in keys if key not in known]
+        leaf_keys = state["keys"] + new_keys
+        stats = state["stats"]
+        linkage_matrix = state["linkage"]
+        all_distances = state["distances"]
+        projection = state.get("projection")
+        if new_keys:
+            old_rows = [row_of[key] for key in state["keys"]]
+            new_rows = [row_of[key] for key in new_keys]
+            Y_old = Y_new = None
+            if method == "ward":
+                components, Y_old, terms = projection
+                Y_new = project_rows(X[new_rows], feature_names, terms, components)
+                projection = (components, np.vstack([Y_old, Y_new]), terms)
+            linkage_matrix, distances, root_attachments = insert_documents(
+                linkage_matrix, X[old_rows], X[new_rows], Y_old, Y_new
+            )
+
+            # Estadísticas de deriva acumuladas desde la última reconstrucción
+            all_distances = np.concatenate([all_distances, distances])
+            inserted = stats["documentos_insertados"] + len(new_keys)
+            stats["distancia_media_insercion"] = float(all_distances.mean())
+            stats["distancia_p95_insercion"] = float(np.percentile(all_distances, 95))
+            stats["documentos_insertados"] = inserted
+            stats["inserciones_en_raiz"] += root_attachments
+            distance_drift = any(
+                stats.get(base) and stats[current] > MAX_ATTACH_DISTANCE_RATIO * stats[base]
+                for current, base in (("distancia_media_insercion", "distancia_media_base"),
+                                      ("distancia_p95_insercion", "distancia_p95_base"))
+            )
+            stats["requiere_reconstruccion"] = bool(
+                inserted / stats["documentos_base"] > MAX_INSERTED_FRACTION
+                or stats["inserciones_en_raiz"] / inserted > MAX_ROOT_ATTACH_FRACTION
+                or distance_drift
+            )
+            print(f"[{method}] Se insertaron {len(new_keys)} documentos nuevos en el árbol existente.")
+            if stats["requiere_reconstruccion"]:
+                print(f"[{method}] La deriva supera los umbrales: la próxima ejecución reconstruirá el árbol.")
+        else:
+            print(f"[{method}] No hay documentos nuevos; se reutiliza el árbol persistido.")
+
+    save_state(folder, method, {
+        "linkage": linkage_matrix, "keys": leaf_keys, "distances": all_distances,
+        "projection": projection, "stats": stats,
+    })
+    return linkage_matrix, [row_of[key] for key in leaf_keys]
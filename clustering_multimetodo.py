@@ -0,0 +1,116 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from scipy.cluster.hierarchy import linkage
+
+from clustering_abstracts import (
+    condensed_size,
+    hierarchical_clustering_average,
+    plot_dendrogram,
+    reduce_dimensions,
+    ward_linkage_vectors,
+)
+from distancias_paralelas import fill_condensed_parallel
+
+#############################################
+# VARIOS MÉTODOS DE LINKAGE SOBRE UNA SOLA MATRIZ DE DISTANCIAS
+#############################################
+
+# Métodos que trabajan sobre el vector condensado; Ward usa los vectores proyectados
+LINKAGE_FUNCTIONS = {
+    "average": hierarchical_clustering_average,
+    "ward": ward_linkage_vectors,
+}
+
+
+def _shared_array(shape, dtype=np.float32):
+    size = max(int(np.prod(shape)), 1) * np.dtype(dtype).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _linkage_worker(shm_name, shape, dtype, method):
+    """
+    Se conecta (sólo lectura) a los datos en memoria compartida y calcula el linkage:
+    el vector condensado de distancias o, para Ward, los vectores proyectados.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = None
+    try:
+        data = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        data.flags.writeable = False
+        function = LINKAGE_FUNCTIONS.get(method)
+        if function is not None:
+            return function(data)
+        return linkage(data, method=method)
+    finally:
+        del data
+        shm.close()
+
+
+def run_linkage_methods(X, methods, max_workers=None):
+    """
+    Calcula una sola vez el vector condensado de distancias coseno (y, si se pide Ward,
+    la proyección densa de TF-IDF), los publica en memoria compartida y ejecuta cada
+    método de linkage en su propio proceso.
+    Las distancias se publican en float64, el tipo con el que trabaja scipy: con float32
+    cada proceso haría su propia copia convertida, del doble de tamaño.
+    Retorna un diccionario método -> matriz de linkage.
+    """
+    n = X.shape[0]
+    max_workers = max_workers or min(len(methods), os.cpu_count() or 1)
+    segments = []
+    try:
+        inputs = {}
+        if any(method != "ward" for method in methods):
+            shm, dist_vector = _shared_array((condensed_size(n),), np.float64)
+            segments.append(shm)
+            inputs["distances"] = (shm.name, dist_vector.shape, "float64")
+            del dist_vector
+            fill_condensed_parallel(X, ("shm", shm.name, np.float64))
+        if "ward" in methods:
+            Y = reduce_dimensions(X)
+            shm, shared_Y = _shared_array(Y.shape)
+            shared_Y[:] = Y
+            segments.append(shm)
+            inputs["ward"] = (shm.name, Y.shape, "float32")
+            del shared_Y, Y
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                method: executor.submit(_linkage_worker, *inputs["ward" if method == "ward" else "distances"], method)
+                for method in methods
+            }
+            return {method: future.result() for method, future in futures.items()}
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+def _render_worker(linkage_matrix, labels, title, filename, node_labels=None):
+    plot_dendrogram(linkage_matrix, labels, title, filename, node_labels=node_labels)
+    return filename
+
+
+def render_dendrograms(linkages, labels, results_folder, max_workers=None, node_labels=None):
+    """
+    Genera en paralelo un PNG por método (dendrogram_<método>.png).
+    `node_labels` (método -> etiquetas de los nodos) se usa para los nodos contraídos.
+    """
+    node_labels = node_labels or {}
+    max_workers = max_workers or min(len(linkages), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _render_worker,
+                linkage_matrix,
+                labels,
+                f"Dendrograma - {method.capitalize()} Linkage",
+                os.path.join(results_folder, f"dendrogram_{method}.png"),
+                node_labels.get(method),
+            )
+            for method, linkage_matrix in linkages.items()
+        ]
+        return [future.result() for future in futures]
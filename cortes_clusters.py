@@ -0,0 +1,89 @@
+import csv
+import numpy as np
+
+#############################################
+# EXTRACCIÓN DE CLUSTERS PLANOS (VARIOS CORTES EN UNA PASADA)
+#############################################
+
+
+def cut_name(criterion, value):
+    """
+    Nombre de la columna de un corte: 'dist_<umbral>' o 'k_<número de clusters>'.
+    """
+    return f"dist_{value:g}" if criterion == "distance" else f"k_{int(value)}"
+
+
+def cut_linkage_multi(linkage_matrix, thresholds=(), n_clusters=(), return_nodes=False):
+    """
+    Calcula las etiquetas de clusters planos para varios umbrales de distancia y/o
+    números de clusters recorriendo una sola vez el orden de uniones del linkage.
+    - Un umbral t une todo lo que se fusiona a altura <= t (criterio 'distance' de fcluster).
+    - Un valor k deja exactamente k clusters (n - k uniones).
+    Retorna un diccionario nombre_del_corte -> etiquetas (1..c, por hoja). Con
+    return_nodes=True retorna además nombre -> id del nodo del árbol de cada cluster
+    (posición etiqueta - 1), útil para etiquetar los clusters.
+    """
+    linkage_matrix = np.asarray(linkage_matrix)
+    n = linkage_matrix.shape[0] + 1
+    heights = linkage_matrix[:, 2]
+
+    cuts = []
+    for t in thresholds:
+        cuts.append((int(np.searchsorted(heights, t, side="right")), cut_name("distance", t)))
+    for k in n_clusters:
+        k = min(max(int(k), 1), n)
+        cuts.append((n - k, cut_name("maxclust", k)))
+    requested = [name for _, name in cuts]
+    cuts.sort()
+
+    # Unión "del pequeño al grande": cada hoja se re-etiqueta O(log n) veces en total
+    labels = np.arange(n, dtype=np.int64)
+    members = {i: [i] for i in range(n)}
+    label_of_node = {i: i for i in range(n)}
+    node_of_label = list(range(n))
+
+    results, nodes = {}, {}
+    step = 0
+    for target, name in cuts:
+        while step < target:
+            a, b = int(linkage_matrix[step, 0]), int(linkage_matrix[step, 1])
+            la, lb = label_of_node.pop(a), label_of_node.pop(b)
+            small, large = (la, lb) if len(members[la]) < len(members[lb]) else (lb, la)
+            moved = members.pop(small)
+            labels[moved] = large
+            members[large].extend(moved)
+            label_of_node[n + step] = large
+            node_of_label[large] = n + step
+            step += 1
+        unique, flat = np.unique(labels, return_inverse=True)
+        results[name] = (flat + 1).astype(np.int32)
+        nodes[name] = np.array([node_of_label[label] for label in unique], dtype=np.int64)
+
+    # Se conserva el orden en que se pidieron los cortes
+    results = {name: results[name] for name in requested}
+    nodes = {name: nodes[name] for name in requested}
+    if return_nodes:
+        return results, nodes
+    return results
+
+
+def export_cluster_assignments(filename, articles, cuts, leaf_of_doc=None, cluster_labels=None):
+    """
+    Escribe un CSV con el DOI y el título de cada artículo y su cluster en cada corte.
+    `leaf_of_doc` indica la hoja del dendrograma de cada artículo (por defecto, la misma posición;
+    en el modo en dos niveles es el micro-cluster).
+    `cluster_labels` (corte -> etiqueta de cada cluster) agrega una columna '<corte>_terminos'.
+    """
+    names = list(cuts)
+    labeled = [name for name in names if cluster_labels and name in cluster_labels]
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["doi", "title"] + names + [f"{name}_terminos" for name in labeled])
+        for idx, article in enumerate(articles):
+            leaf = idx if leaf_of_doc is None else int(leaf_of_doc[idx])
+            writer.writerow(
+                [article.get("doi", "Unknown"), article.get("title", "Unknown")]
+                + [int(cuts[name][leaf]) for name in names]
+                + [cluster_labels[name][cuts[name][leaf] - 1] for name in labeled]
+            )
+    print(f"Asignaciones de clusters guardadas en: {filename}")
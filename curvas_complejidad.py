@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+from medicion_tiempos import format_result, measure_algorithm
+from ordenamiento_vectorizado import sort_input
+
+#############################################
+# CURVAS EMPÍRICAS DE COMPLEJIDAD DE LOS ALGORITMOS DE ORDENAMIENTO
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FOLDER = os.path.join(SCRIPT_DIR, "resultados")
+# Serie geométrica de tamaños: START_SIZE, START_SIZE * GROWTH, ... hasta MAX_SIZE
+START_SIZE = 100
+GROWTH = 2
+MAX_SIZE = 1 << 20
+# Cuando la mediana de un algoritmo supera este tiempo (segundos) no se prueban tamaños mayores
+TIME_BUDGET = 2.0
+CURVE_REPEATS = 3
+# Tamaños para los que se reporta el tiempo estimado con el modelo ajustado
+PREDICTION_SIZES = [10 ** 5, 10 ** 6]
+
+MODELS = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * np.log2(n),
+    "n^2": lambda n: n ** 2,
+}
+
+
+def geometric_sizes(start=START_SIZE, growth=GROWTH, max_size=MAX_SIZE):
+    sizes = []
+    size = start
+    while size <= max_size:
+        sizes.append(int(size))
+        size *= growth
+    return sizes
+
+
+def fit_models(sizes, times_ms):
+    """
+    Ajusta t(n) = c · g(n) para cada modelo en escala logarítmica (todos los tamaños
+    pesan igual aunque los tiempos difieran en órdenes de magnitud).
+    Retorna modelo -> {constante_ms, error_log} y el modelo con menor error.
+    """
+    n = np.asarray(sizes, dtype=np.float64)
+    log_t = np.log(np.asarray(times_ms, dtype=np.float64))
+    fits = {}
+    for name, g in MODELS.items():
+        residual = log_t - np.log(g(n))
+        log_c = residual.mean()
+        fits[name] = {
+            "constante_ms": float(np.exp(log_c)),
+            "error_log": float(np.sqrt(np.mean((residual - log_c) ** 2))),
+        }
+    best = min(fits, key=lambda name: fits[name]["error_log"])
+    return fits, best
+
+
+def measure_curve(algorithm, source_data, sizes, budget=TIME_BUDGET, repeats=CURVE_REPEATS, seed=0):
+    """
+    Mide el algoritmo para tamaños crecientes. Las entradas se obtienen remuestreando
+    `source_data` (claves reales de un atributo). Se detiene en el primer tamaño cuya
+    mediana supera `budget` segundos, o que agota el tiempo o falla. Antes de cada tamaño
+    se extrapola la mediana con el exponente observado entre los dos puntos anteriores;
+    si no cabría en el límite duro, el tamaño no se ejecuta.
+    """
+    rng = np.random.default_rng(seed)
+    # Límite duro: calentamiento + repeticiones de un tamaño cuyo anterior estaba justo
+    # bajo el presupuesto, con crecimiento cuadrático (GROWTH² por paso)
+    timeout = budget * (repeats + 1) * GROWTH ** 2
+    points = []
+    for size in sizes:
+        ok = [p for p in points if p["estado"] == "ok" and p["mediana_ms"] > 0]
+        if ok:
+            exponent = 1.0
+            if len(ok) >= 2:
+                exponent = max(1.0, np.log(ok[-1]["mediana_ms"] / ok[-2]["mediana_ms"]) / np.log(ok[-1]["n"] / ok[-2]["n"]))
+            predicted_s = ok[-1]["mediana_ms"] / 1000 * (size / ok[-1]["n"]) ** exponent
+            if predicted_s * (repeats + 1) > timeout:
+                print(f"  n={size:<9} omitido (estimado {predicted_s:.1f} s por ejecución)")
+                break
+        data = sort_input(algorithm, rng.choice(source_data, size=size))
+        result = measure_algorithm(algorithm, data, repeats=repeats, timeout=timeout)
+        result["n"] = size
+        points.append(result)
+        print(f"  n={size:<9} {format_result(result)}")
+        if result["estado"] != "ok" or result["mediana_ms"] > budget * 1000:
+            break
+    return points
+
+
+def plot_curves(curves, filename):
+    names = list(curves)
+    columns = 3
+    rows = max(1, -(-len(names) // columns))
+    fig, axes = plt.subplots(rows, columns, figsize=(5 * columns, 4 * rows), squeeze=False)
+    for ax, name in zip(axes.ravel(), names):
+        curve = curves[name]
+        ok = [p for p in curve["puntos"] if p["estado"] == "ok"]
+        ax.set_title(name, fontsize=10)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("n")
+        ax.set_ylabel("ms")
+        if not ok:
+            continue
+        ax.plot([p["n"] for p in ok], [p["mediana_ms"] for p in ok], "o", color="tab:blue", label="medido")
+        if curve["mejor_modelo"]:
+            n = np.geomspace(ok[0]["n"], max(PREDICTION_SIZES + [ok[-1]["n"]]), 50)
+            for model, fit in curve["modelos"].items():
+                style = "-" if model == curve["mejor_modelo"] else ":"
+                ax.plot(n, fit["constante_ms"] * MODELS[model](n), style, label=f"{model} (c={fit['constante_ms']:.2e})")
+        ax.legend(fontsize=7)
+    for ax in axes.ravel()[len(names):]:
+        ax.axis("off")
+    fig.suptitle("Curvas empíricas de complejidad", fontsize=14, fontweight="bold")
+    fig.tight_layout(rect=(0, 0, 1, 0.97))
+    fig.savefig(filename)
+    plt.close(fig)
+    print(f"Gráfico guardado en: {filename}")
+
+
+def run_complexity_curves(algorithms_funcs, source_data, sizes=None, budget=TIME_BUDGET, results_folder=RESULTS_FOLDER):
+    """
+    Mide cada algoritmo sobre la serie geométrica de tamaños, ajusta los modelos n,
+    n log n y n² y guarda las constantes, el mejor modelo y las predicciones en
+    resultados/curvas_complejidad.json junto con el gráfico de las curvas.
+    """
+    sizes = sizes or geometric_sizes()
+    source_data = np.asarray(source_data)
+    if len(source_data) == 0:
+        raise ValueError("No hay datos para generar las entradas de las curvas.")
+    curves = {}
+    for algo_name, function in algorithms_funcs.items():
+        print(f"Curva de complejidad: {algo_name}")
+        points = measure_curve(function, source_data, sizes, budget)
+        ok = [p for p in points if p["estado"] == "ok"]
+        curve = {"puntos": points, "modelos": {}, "mejor_modelo": None, "prediccion_ms": {}}
+        if len(ok) >= 2:
+            curve["modelos"], curve["mejor_modelo"] = fit_models([p["n"] for p in ok], [p["mediana_ms"] for p in ok])
+            best = curve["modelos"][curve["mejor_modelo"]]
+            curve["prediccion_ms"] = {
+                str(size): best["constante_ms"] * float(MODELS[curve["mejor_modelo"]](size)) for size in PREDICTION_SIZES
+            }
+            print(f"  Mejor modelo: {curve['mejor_modelo']} (c = {best['constante_ms']:.3e} ms)")
+        curves[algo_name] = curve
+
+    os.makedirs(results_folder, exist_ok=True)
+    report_file = os.path.join(results_folder, "curvas_complejidad.json")
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump({"fecha": time.strftime("%Y-%m-%d %H:%M:%S"), "presupuesto_s": budget, "curvas": curves}, f, ensure_ascii=False, indent=2)
+    print(f"Curvas de complejidad guardadas en: {report_file}")
+    plot_curves(curves, os.path.join(results_folder, "curvas_complejidad.png"))
+    return curves
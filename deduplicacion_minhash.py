@@ -0,0 +1,98 @@
+import zlib
+import numpy as np
+
+from clustering_abstracts import preprocess_texts
+
+#############################################
+# AGRUPACIÓN DE CASI-DUPLICADOS CON MINHASH + LSH
+#############################################
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Jaccard estimado mínimo para considerar dos abstracts como el mismo artículo
+SIMILARITY_THRESHOLD = 0.8
+
+_PRIME = np.uint64(4294967311)  # primo mayor que 2^32
+
+
+def shingles(text, k=SHINGLE_SIZE):
+    """
+    Conjunto de k-gramas de palabras del texto (ya normalizado), como hashes CRC32.
+    """
+    words = text.split()
+    if len(words) <= k:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams)))
+
+
+def minhash_signatures(texts, num_perm=NUM_PERMUTATIONS, seed=0):
+    """
+    Firma MinHash de cada texto: el mínimo de `num_perm` funciones hash universales
+    (a·x + b) mod p sobre sus shingles.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.integers(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        values = shingles(text)[None, :]
+        signatures[i] = (((a * values) % _PRIME + b) % _PRIME).min(axis=1)
+    return signatures
+
+
+def lsh_groups(signatures, bands=LSH_BANDS, threshold=SIMILARITY_THRESHOLD):
+    """
+    Agrupa firmas similares con locality-sensitive hashing: las firmas se dividen en
+    `bands` bandas y los documentos que coinciden en alguna banda son candidatos.
+    Cada candidato se compara sólo con el primer documento de su cubeta y se une si
+    la similitud de Jaccard estimada supera `threshold` (tiempo aproximadamente lineal).
+    Retorna el grupo de cada documento (0..g-1, en orden de primera aparición).
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    parent = np.arange(n)
+
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        heads = {}
+        for i in range(n):
+            key = block[i].tobytes()
+            head = heads.setdefault(key, i)
+            if head == i:
+                continue
+            root_i, root_head = find(i), find(head)
+            if root_i != root_head and np.mean(signatures[i] == signatures[head]) >= threshold:
+                parent[max(root_i, root_head)] = min(root_i, root_head)
+
+    roots = np.array([find(i) for i in range(n)])
+    _, first_seen, group = np.unique(roots, return_index=True, return_inverse=True)
+    # Renumerar los grupos en orden de primera aparición
+    order = np.argsort(np.argsort(first_seen))
+    return order[group]
+
+
+def near_duplicate_groups(abstracts, threshold=SIMILARITY_THRESHOLD):
+    """
+    Detecta abstracts casi idénticos (el mismo artículo descargado de varias fuentes).
+    Retorna (índice del representante de cada grupo, grupo de cada documento, tamaño de cada grupo).
+    El representante es la primera aparición del grupo.
+    """
+    signatures = minhash_signatures(preprocess_texts(abstracts))
+    group_of_doc = lsh_groups(signatures, threshold=threshold)
+    n_groups = int(group_of_doc.max()) + 1 if len(group_of_doc) else 0
+    representatives = np.full(n_groups, -1, dtype=np.int64)
+    for doc in range(len(group_of_doc) - 1, -1, -1):
+        representatives[group_of_doc[doc]] = doc
+    multiplicity = np.bincount(group_of_doc, minlength=n_groups)
+    return representatives, group_of_doc, multiplicity
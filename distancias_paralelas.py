@@ -0,0 +1,144 @@
+import os
+import tempfile
+import numpy as np
+from scipy import sparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from clustering_abstracts import condensed_offset, condensed_size, fill_condensed_rows
+
+#############################################
+# DISTANCIAS COSENO POR BLOQUES EN VARIOS PROCESOS
+#############################################
+
+# Bloques por proceso: más bloques reparten mejor la carga entre núcleos
+TILES_PER_JOB = 4
+# Por debajo de este número de documentos no compensa arrancar el pool
+MIN_PARALLEL_ROWS = 2000
+# Elementos máximos del bloque denso que cada proceso materializa a la vez
+BLOCK_ELEMENTS = 1 << 24
+
+_worker_state = {}
+
+
+def _open_target(target, n):
+    """
+    Abre el buffer de destino: ("shm", nombre) para memoria compartida, ("memmap", ruta)
+    para un vector condensado en disco o ("square_memmap", ruta) para una matriz n x n
+    en disco; un tercer elemento opcional indica el dtype (float32 por defecto).
+    Retorna (arreglo, recurso a cerrar).
+    """
+    kind, location, *options = target
+    dtype = options[0] if options else np.float32
+    if kind == "shm":
+        shm = shared_memory.SharedMemory(name=location)
+        return np.ndarray((condensed_size(n),), dtype=dtype, buffer=shm.buf), shm
+    if kind == "memmap":
+        return np.memmap(location, dtype=dtype, mode="r+", shape=(condensed_size(n),)), None
+    if kind == "square_memmap":
+        return np.memmap(location, dtype=dtype, mode="r+", shape=(n, n)), None
+    raise ValueError(f"Destino no soportado: {kind}")
+
+
+def _init_worker(X, target):
+    _worker_state["X"] = X
+    _worker_state["out"], _worker_state["handle"] = _open_target(target, X.shape[0])
+
+
+def _fill_square_rows(X, start, stop, out):
+    """
+    Escribe las filas completas [start, stop) de la matriz cuadrada de distancias coseno.
+    """
+    similarity = X[start:stop] @ X.T
+    if sparse.issparse(similarity):
+        similarity = similarity.toarray()
+    rows = np.clip(1.0 - similarity, 0.0, 2.0)
+    rows[np.arange(stop - start), np.arange(start, stop)] = 0.0
+    out[start:stop] = rows
+
+
+def _fill_rows(start, stop, X, out):
+    n = X.shape[0]
+    if out.ndim == 2:
+        block_rows = max(1, BLOCK_ELEMENTS // max(n, 1))
+        for block_start in range(start, stop, block_rows):
+            _fill_square_rows(X, block_start, min(block_start + block_rows, stop), out)
+        return
+    block_rows = max(1, BLOCK_ELEMENTS // max(n - start, 1))
+    for block_start in range(start, stop, block_rows):
+        fill_condensed_rows(X, block_start, min(block_start + block_rows, stop), out, n)
+
+
+def _tile_worker(start, stop):
+    out = _worker_state["out"]
+    _fill_rows(start, stop, _worker_state["X"], out)
+    if isinstance(out, np.memmap):
+        out.flush()
+    return stop - start
+
+
+def balanced_tiles(n, n_tiles):
+    """
+    Divide las filas en rangos contiguos con aproximadamente el mismo número de pares
+    (las primeras filas tienen más pares j > i que las últimas).
+    """
+    offsets = np.array([condensed_offset(n, i) for i in range(n + 1)], dtype=np.int64)
+    targets = np.linspace(0, offsets[-1], n_tiles + 1)
+    bounds = np.unique(np.searchsorted(offsets, targets, side="left"))
+    bounds[0], bounds[-1] = 0, n
+    bounds = np.unique(bounds)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def fill_condensed_parallel(X, target, n_jobs=None):
+    """
+    Escribe las distancias coseno de la matriz TF-IDF en `target` (vector condensado en
+    memoria compartida o memmap, o matriz cuadrada en memmap) repartiendo bloques de
+    filas entre procesos.
+    Cada proceso recibe la matriz dispersa una sola vez (al iniciarse) y escribe
+    sus bloques directamente en el buffer compartido.
+    """
+    n = X.shape[0]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or n < MIN_PARALLEL_ROWS:
+        out, handle = _open_target(target, n)
+        _fill_rows(0, n, X, out)
+        if isinstance(out, np.memmap):
+            out.flush()
+        del out
+        if handle is not None:
+            handle.close()
+        return
+
+    if target[0] == "square_memmap":
+        # En la matriz cuadrada todas las filas tienen el mismo número de elementos
+        bounds = np.linspace(0, n, n_jobs * TILES_PER_JOB + 1).astype(np.int64)
+        tiles = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    else:
+        tiles = balanced_tiles(n, n_jobs * TILES_PER_JOB)
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(X, target)) as executor:
+        futures = [executor.submit(_tile_worker, start, stop) for start, stop in tiles]
+        for future in futures:
+            future.result()
+
+
+def parallel_condensed_cosine_distances(X, path=None, n_jobs=None):
+    """
+    Calcula el vector condensado de distancias coseno en paralelo sobre un numpy.memmap.
+    Si no se indica `path` se usa un archivo temporal, que se elimina del sistema de
+    archivos en cuanto queda mapeado (en Windows queda en la carpeta temporal).
+    El resultado puede pasarse directamente a hierarchical_clustering_average.
+    """
+    temporary = path is None
+    if temporary:
+        fd, path = tempfile.mkstemp(suffix=".dist")
+        os.close(fd)
+    out = np.memmap(path, dtype=np.float32, mode="w+", shape=(condensed_size(X.shape[0]),))
+    out.flush()
+    fill_condensed_parallel(X, ("memmap", path), n_jobs)
+    if temporary:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return out
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.preprocessing import normalize
+
+from clustering_abstracts import (
+    article_label,
+    condensed_cosine_distances,
+    hierarchical_clustering_average,
+    hierarchical_clustering_ward,
+    plot_dendrogram,
+)
+
+#############################################
+# ESTABILIDAD DE LOS DENDROGRAMAS POR BOOTSTRAP
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPLICATES = 100
+# "caracteristicas": remuestreo con reemplazo de las columnas TF-IDF
+# "documentos": submuestra de documentos sin reemplazo (fracción DEFAULT_FRACTION)
+DEFAULT_MODE = "caracteristicas"
+DEFAULT_FRACTION = 0.8
+# Cada cuántas réplicas terminadas se reescribe el JSON con los resultados parciales
+PARTIAL_EVERY = 10
+
+_worker_state = {}
+
+
+def clade_hashes(linkage_matrix, leaf_keys):
+    """
+    Hash Zobrist de cada nodo interno: XOR de las claves aleatorias de sus hojas.
+    Dos árboles contienen el mismo cluster si y sólo si (salvo colisiones de 64 bits)
+    comparten el hash, así que comparar clusters cuesta O(n) por árbol.
+    """
+    n = len(leaf_keys)
+    hashes = np.empty(2 * n - 1, dtype=np.uint64)
+    hashes[:n] = leaf_keys
+    for i, (a, b) in enumerate(linkage_matrix[:, :2].astype(np.int64)):
+        hashes[n + i] = hashes[a] ^ hashes[b]
+    return hashes[n:]
+
+
+def compute_linkage(X, method):
+    if method == "average":
+        return hierarchical_clustering_average(condensed_cosine_distances(X))
+    if method == "ward":
+        return hierarchical_clustering_ward(X)
+    raise ValueError(f"Método no soportado: {method}")
+
+
+def _init_worker(X, reference, keys, method, mode, fraction):
+    _worker_state.update(X=X, reference=reference, keys=keys, method=method, mode=mode, fraction=fraction)
+
+
+def _replicate(seed):
+    """
+    Calcula una réplica y retorna, por cada nodo interno del árbol de referencia,
+    si el cluster aparece en la réplica y si la réplica permite evaluarlo.
+    """
+    state = _worker_state
+    X, reference, keys = state["X"], state["reference"], state["keys"]
+    n = X.shape[0]
+    rng = np.random.default_rng(seed)
+
+    if state["mode"] == "caracteristicas":
+        columns = rng.integers(0, X.shape[1], size=X.shape[1])
+        Z = compute_linkage(normalize(X[:, columns]), state["method"])
+        replicate = set(clade_hashes(Z, keys).tolist())
+        reference_hashes = clade_hashes(reference, keys)
+        valid = np.ones(n - 1, dtype=bool)
+    else:
+        rows = np.sort(rng.choice(n, size=max(3, int(state["fraction"] * n)), replace=False))
+        Z = compute_linkage(X[rows], state["method"])
+        replicate = set(clade_hashes(Z, keys[rows]).tolist())
+        # Cada cluster de referencia se restringe a los documentos de la submuestra
+        sampled = np.zeros(n, dtype=bool)
+        sampled[rows] = True
+        reference_hashes = clade_hashes(reference, np.where(sampled, keys, np.uint64(0)))
+        counts = np.empty(2 * n - 1, dtype=np.int64)
+        counts[:n] = sampled
+        for i, (a, b) in enumerate(reference[:, :2].astype(np.int64)):
+            counts[n + i] = counts[a] + counts[b]
+        valid = counts[n:] >= 2
+
+    hits = np.fromiter((h in replicate for h in reference_hashes.tolist()), dtype=bool, count=n - 1)
+    return hits & valid, valid
+
+
+def _write_report(filename, method, mode, done, hits, valid, elapsed):
+    support = np.divide(hits, valid, out=np.zeros(len(hits)), where=valid > 0)
+    report = {
+        "metodo": method,
+        "modo": mode,
+        "replicas_completadas": done,
+        "segundos": elapsed,
+        "soporte": support.tolist(),
+        "replicas_evaluables": valid.tolist(),
+    }
+    with open(filename + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(report, f)
+    os.replace(filename + ".tmp", filename)
+    return support
+
+
+def bootstrap_support(X, reference, method, replicates=DEFAULT_REPLICATES, mode=DEFAULT_MODE,
+                      fraction=DEFAULT_FRACTION, max_workers=None, report_file=None, seed=0):
+    """
+    Soporte bootstrap de cada nodo interno del árbol de referencia (fracción de réplicas
+    en que reaparece el mismo cluster). La matriz TF-IDF se envía una sola vez a cada
+    proceso; las réplicas se acumulan a medida que terminan y, si se indica
+    `report_file`, los resultados parciales se escriben cada PARTIAL_EVERY réplicas.
+    """
+    n = X.shape[0]
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, np.iinfo(np.uint64).max, size=n, dtype=np.uint64, endpoint=True)
+    seeds = rng.integers(0, 2 ** 63, size=replicates).tolist()
+    hits = np.zeros(n - 1, dtype=np.int64)
+    valid = np.zeros(n - 1, dtype=np.int64)
+    start = time.perf_counter()
+    done = 0
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        initializer=_init_worker,
+        initargs=(X, reference, keys, method, mode, fraction),
+    ) as executor:
+        futures = [executor.submit(_replicate, s) for s in seeds]
+        for future in as_completed(futures):
+            replicate_hits, replicate_valid = future.result()
+            hits += replicate_hits
+            valid += replicate_valid
+            done += 1
+            if report_file and (done % PARTIAL_EVERY == 0 or done == replicates):
+                _write_report(report_file, method, mode, done, hits, valid, time.perf_counter() - start)
+                print(f"  {method}: {done}/{replicates} réplicas")
+
+    return np.divide(hits, valid, out=np.zeros(n - 1), where=valid > 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soporte bootstrap de los clusters de los dendrogramas.")
+    parser.add_argument("--replicas", type=int, default=DEFAULT_REPLICATES)
+    parser.add_argument("--modo", choices=["caracteristicas", "documentos"], default=DEFAULT_MODE)
+    parser.add_argument("--fraccion", type=float, default=DEFAULT_FRACTION, help="Fracción de documentos por réplica (modo documentos).")
+    parser.add_argument("--metodos", nargs="+", choices=["average", "ward"], default=["average", "ward"])
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+
+    json_filepath = os.path.join(SCRIPT_DIR, "processed_articles.json")
+    with open(json_filepath, "r", encoding="utf-8") as f:
+        articles = [a for a in json.load(f) if a.get("abstract", "").strip()]
+    if len(articles) < 3:
+        print("No hay suficientes abstracts para el análisis de estabilidad.")
+        return
+
+    # La vectorización se toma de la caché TF-IDF del clustering
+    from cache_tfidf import TfidfFeatureCache
+
+    X = TfidfFeatureCache(os.path.join(SCRIPT_DIR, "cache", "tfidf")).transform([a["abstract"] for a in articles])
+    labels = [article_label(a) for a in articles]
+    results_folder = os.path.join(SCRIPT_DIR, "resultados")
+    os.makedirs(results_folder, exist_ok=True)
+
+    for method in args.metodos:
+        print(f"Bootstrap {method}: {args.replicas} réplicas ({args.modo})")
+        reference = compute_linkage(X, method)
+        support = bootstrap_support(
+            X, reference, method, args.replicas, args.modo, args.fraccion, args.procesos,
+            report_file=os.path.join(results_folder, f"bootstrap_{method}.json"),
+        )
+        n = X.shape[0]
+        annotations = {n + i: f"{100 * value:.0f}" for i, value in enumerate(support)}
+        plot_dendrogram(
+            reference, labels, f"Dendrograma - {method.capitalize()} Linkage (soporte bootstrap %)",
+            os.path.join(results_folder, f"dendrogram_bootstrap_{method}.png"), node_annotations=annotations,
+        )
+
+
+if __name__ == "__main__":
+    main()
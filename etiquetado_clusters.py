@@ -0,0 +1,81 @@
+import numpy as np
+from scipy import sparse
+
+#############################################
+# ETIQUETAS DE CLUSTERS A PARTIR DE CENTROIDES TF-IDF DISPERSOS
+#############################################
+
+# Términos por etiqueta de cluster
+CLUSTER_LABEL_TERMS = 3
+
+
+def _merge_sums(a, b):
+    """
+    Suma dos vectores dispersos representados como (índices de columna, valores).
+    """
+    indices = np.concatenate((a[0], b[0]))
+    values = np.concatenate((a[1], b[1]))
+    columns, position = np.unique(indices, return_inverse=True)
+    return columns, np.bincount(position, weights=values, minlength=len(columns))
+
+
+def label_tree_nodes(linkage_matrix, X, feature_names, leaf_of_doc=None, top_k=CLUSTER_LABEL_TERMS):
+    """
+    Etiqueta cada nodo del árbol (hojas 0..n-1 y uniones n..2n-2) con sus términos más
+    discriminativos: los de mayor diferencia entre el centroide TF-IDF del cluster y el
+    centroide global.
+    Las sumas dispersas de cada cluster se acumulan de abajo hacia arriba en el orden de
+    uniones (la suma de un nodo es la de sus dos hijos), así que todos los nodos se
+    etiquetan en una sola pasada O(n·nnz) sin recorrer los documentos de cada cluster.
+    `leaf_of_doc` indica la hoja de cada fila de X (por defecto, la misma posición; en el
+    modo en dos niveles es el micro-cluster).
+    Retorna una lista de 2n-1 etiquetas ("término, término, término").
+    """
+    linkage_matrix = np.asarray(linkage_matrix)
+    n = linkage_matrix.shape[0] + 1
+    X = sparse.csr_matrix(X)
+    m = X.shape[0]
+    if leaf_of_doc is None:
+        leaf_of_doc = np.arange(m)
+    leaf_of_doc = np.asarray(leaf_of_doc, dtype=np.int64)
+
+    # Suma de las filas de cada hoja y número de documentos por hoja
+    membership = sparse.csr_matrix((np.ones(m), (leaf_of_doc, np.arange(m))), shape=(n, m))
+    leaf_sums = (membership @ X).tocsr()
+    sizes = np.bincount(leaf_of_doc, minlength=n).astype(np.int64)
+    global_mean = np.asarray(X.mean(axis=0), dtype=np.float64).ravel()
+    names = np.asarray(feature_names)
+
+    def top_terms(columns, values, size):
+        if size == 0 or len(columns) == 0:
+            return ""
+        scores = values / size - global_mean[columns]
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return ", ".join(names[columns[best[scores[best] > 1e-6]]].tolist())
+
+    labels = [""] * (2 * n - 1)
+    pending = {}
+    for leaf in range(n):
+        start, end = leaf_sums.indptr[leaf], leaf_sums.indptr[leaf + 1]
+        pending[leaf] = (leaf_sums.indices[start:end], leaf_sums.data[start:end].astype(np.float64))
+        labels[leaf] = top_terms(*pending[leaf], sizes[leaf])
+
+    node_sizes = np.concatenate((sizes, np.zeros(n - 1, dtype=np.int64)))
+    for i, (a, b) in enumerate(linkage_matrix[:, :2].astype(np.int64)):
+        node = n + i
+        # Cada hijo se usa una sola vez: se libera en cuanto se une a su padre
+        pending[node] = _merge_sums(pending.pop(a), pending.pop(b))
+        node_sizes[node] = node_sizes[a] + node_sizes[b]
+        labels[node] = top_terms(*pending[node], node_sizes[node])
+    return labels
+
+
+def cut_cluster_labels(nodes, node_labels):
+    """
+    Etiqueta de cada cluster de cada corte a partir de los nodos que retorna
+    cut_linkage_multi(..., return_nodes=True). Retorna nombre_del_corte -> lista de
+    etiquetas (posición etiqueta_del_cluster - 1).
+    """
+    return {name: [node_labels[node] for node in cut_nodes] for name, cut_nodes in nodes.items()}
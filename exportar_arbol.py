@@ -0,0 +1,263 @@
+import os
+import json
+import mmap
+import struct
+import argparse
+import numpy as np
+from scipy.cluster.hierarchy import leaves_list
+
+#############################################
+# EXPORTACIÓN DEL ÁRBOL CON ACCESO ALEATORIO (BINARIO + NEWICK)
+#############################################
+
+MAGIC = b"DENDRO01"
+# Cabecera: firma, número de hojas y offsets de las secciones de hojas y de etiquetas
+HEADER = struct.Struct("<8sQQQQ")
+# Registro de tamaño fijo por nodo (ids 0..2n-2, hojas primero, como en scipy):
+# hijos (-1 en las hojas), padre (-1 en la raíz), número de hojas, primera posición de
+# sus hojas en el orden del dendrograma y altura de la unión
+NODE_DTYPE = np.dtype([
+    ("left", "<i4"),
+    ("right", "<i4"),
+    ("parent", "<i4"),
+    ("size", "<i4"),
+    ("leaf_start", "<i4"),
+    ("height", "<f8"),
+])
+
+
+def tree_arrays(linkage_matrix):
+    """
+    Registros de todos los nodos y el orden de las hojas en el dendrograma. Las hojas
+    de cada subárbol ocupan el rango contiguo [leaf_start, leaf_start + size) de ese orden.
+    """
+    linkage_matrix = np.asarray(linkage_matrix)
+    n = linkage_matrix.shape[0] + 1
+    order = leaves_list(linkage_matrix).astype(np.int32)
+    nodes = np.zeros(2 * n - 1, dtype=NODE_DTYPE)
+    nodes["left"][:n] = nodes["right"][:n] = nodes["parent"][-1] = -1
+    nodes["size"][:n] = 1
+    nodes["leaf_start"][order] = np.arange(n, dtype=np.int32)
+
+    children = linkage_matrix[:, :2].astype(np.int64)
+    internal = np.arange(n, 2 * n - 1)
+    nodes["left"][n:] = children[:, 0]
+    nodes["right"][n:] = children[:, 1]
+    nodes["parent"][children[:, 0]] = internal
+    nodes["parent"][children[:, 1]] = internal
+    nodes["size"][n:] = linkage_matrix[:, 3]
+    nodes["height"][n:] = linkage_matrix[:, 2]
+    leaf_start = nodes["leaf_start"]
+    for i, (a, b) in enumerate(children):
+        leaf_start[n + i] = min(leaf_start[a], leaf_start[b])
+    return nodes, order
+
+
+def export_tree(linkage_matrix, labels, filename, node_labels=None, metadata=None):
+    """
+    Escribe el árbol en un archivo binario con registros de tamaño fijo (el nodo i está
+    en un offset calculable), el orden de las hojas y las etiquetas (las hojas usan
+    `labels`; los nodos internos, `node_labels` si se pasan, p. ej. sus términos).
+    Junto al archivo se guarda un JSON con los metadatos y los offsets de cada sección.
+    """
+    nodes, order = tree_arrays(linkage_matrix)
+    n = len(order)
+    all_labels = list(labels) + [""] * (n - 1)
+    if node_labels is not None:
+        all_labels[n:] = node_labels[n:]
+    encoded = [str(label).encode("utf-8") for label in all_labels]
+    label_offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    label_offsets[1:] = np.cumsum([len(e) for e in encoded])
+
+    nodes_offset = HEADER.size
+    order_offset = nodes_offset + nodes.nbytes
+    label_index_offset = order_offset + order.nbytes
+    label_blob_offset = label_index_offset + label_offsets.nbytes
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n, order_offset, label_index_offset, label_blob_offset))
+        f.write(nodes.tobytes())
+        f.write(order.astype("<i4").tobytes())
+        f.write(label_offsets.tobytes())
+        for e in encoded:
+            f.write(e)
+
+    description = dict(metadata or {})
+    description.update(
+        formato="DENDRO01",
+        hojas=n,
+        nodos=2 * n - 1,
+        raiz=2 * n - 2,
+        bytes_por_nodo=NODE_DTYPE.itemsize,
+        campos_nodo=list(NODE_DTYPE.names),
+        offset_nodos=nodes_offset,
+        offset_orden_hojas=order_offset,
+        offset_indice_etiquetas=label_index_offset,
+        offset_etiquetas=label_blob_offset,
+    )
+    with open(os.path.splitext(filename)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(description, f, ensure_ascii=False, indent=2)
+    print(f"Árbol exportado en: {filename}")
+
+
+def _newick_label(label):
+    return "'" + str(label).replace("'", "''") + "'"
+
+
+def _newick_tokens(root, n, left, right, height, label):
+    """
+    Recorrido iterativo (sin recursión, válido para árboles profundos) que produce los
+    fragmentos Newick del subárbol `root`; la longitud de cada rama es la diferencia
+    de alturas con su padre.
+    """
+    stack = [(root, None)]
+    while stack:
+        item, parent_height = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+        length = "" if parent_height is None else f":{parent_height - height(item):.6g}"
+        if item < n:
+            yield _newick_label(label(item)) + length
+            continue
+        h = height(item)
+        stack.append((")" + length, None))
+        stack.append((right(item), h))
+        stack.append((",", None))
+        stack.append((left(item), h))
+        yield "("
+
+
+def write_newick(linkage_matrix, labels, filename):
+    """
+    Exporta el árbol completo en formato Newick (interoperable con otras herramientas).
+    """
+    linkage_matrix = np.asarray(linkage_matrix)
+    n = linkage_matrix.shape[0] + 1
+    children = linkage_matrix[:, :2].astype(np.int64)
+    heights = linkage_matrix[:, 2]
+    tokens = _newick_tokens(
+        2 * n - 2, n,
+        lambda node: children[node - n, 0],
+        lambda node: children[node - n, 1],
+        lambda node: 0.0 if node < n else float(heights[node - n]),
+        lambda node: labels[node],
+    )
+    with open(filename, "w", encoding="utf-8") as f:
+        for token in tokens:
+            f.write(token)
+        f.write(";\n")
+    print(f"Árbol Newick guardado en: {filename}")
+
+
+class TreeReader:
+    """
+    Lector perezoso del formato binario: el archivo se mapea en memoria y sólo se leen
+    las páginas de los nodos, hojas y etiquetas consultados, así que explorar un subárbol
+    cuesta lo proporcional a ese subárbol y no al árbol completo.
+    """
+
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, order_offset, label_index_offset, label_blob_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} no es un árbol exportado ({magic!r}).")
+        self.n_leaves = n
+        self.root = 2 * n - 2
+        self.nodes = np.frombuffer(self._map, dtype=NODE_DTYPE, count=2 * n - 1, offset=HEADER.size)
+        self.order = np.frombuffer(self._map, dtype="<i4", count=n, offset=order_offset)
+        self._label_offsets = np.frombuffer(self._map, dtype="<u8", count=2 * n, offset=label_index_offset)
+        self._label_blob_offset = label_blob_offset
+
+    def close(self):
+        self.nodes = self.order = self._label_offsets = None
+        try:
+            self._map.close()
+        except BufferError:
+            # El llamador aún tiene vistas de `nodes` u `order`: el mapa se libera con ellas
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def node(self, node_id):
+        record = self.nodes[node_id]
+        return {
+            "id": int(node_id),
+            "left": int(record["left"]),
+            "right": int(record["right"]),
+            "parent": int(record["parent"]),
+            "size": int(record["size"]),
+            "leaf_start": int(record["leaf_start"]),
+            "height": float(record["height"]),
+            "label": self.label(node_id),
+        }
+
+    def children(self, node_id):
+        record = self.nodes[node_id]
+        return () if record["left"] < 0 else (int(record["left"]), int(record["right"]))
+
+    def label(self, node_id):
+        start, end = self._label_offsets[node_id], self._label_offsets[node_id + 1]
+        return self._map[self._label_blob_offset + int(start):self._label_blob_offset + int(end)].decode("utf-8")
+
+    def leaves(self, node_id):
+        """
+        Hojas del subárbol en el orden del dendrograma (copia de un corte del arreglo de
+        orden: una vista sobre el mapa impediría cerrar el lector).
+        """
+        record = self.nodes[node_id]
+        start = int(record["leaf_start"])
+        return np.array(self.order[start:start + int(record["size"])])
+
+    def subtree(self, node_id, depth=2):
+        """
+        Nodos del subárbol hasta `depth` niveles por debajo de `node_id` (recorrido en anchura).
+        """
+        result, frontier = [], [node_id]
+        for _ in range(depth + 1):
+            result.extend(self.node(node) for node in frontier)
+            frontier = [child for node in frontier for child in self.children(node)]
+            if not frontier:
+                break
+        return result
+
+    def newick(self, node_id=None):
+        """
+        Newick del subárbol (por defecto, del árbol completo).
+        """
+        node_id = self.root if node_id is None else node_id
+        nodes = self.nodes
+        tokens = _newick_tokens(
+            node_id, self.n_leaves,
+            lambda node: int(nodes[node]["left"]),
+            lambda node: int(nodes[node]["right"]),
+            lambda node: float(nodes[node]["height"]),
+            self.label,
+        )
+        return "".join(tokens) + ";"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explora un árbol exportado (resultados/arbol_<método>.arbol).")
+    parser.add_argument("archivo")
+    parser.add_argument("--nodo", type=int, default=None, help="Id del nodo (por defecto, la raíz).")
+    parser.add_argument("--profundidad", type=int, default=2)
+    parser.add_argument("--newick", action="store_true", help="Imprime el subárbol en formato Newick.")
+    args = parser.parse_args()
+
+    with TreeReader(args.archivo) as tree:
+        node_id = tree.root if args.nodo is None else args.nodo
+        if args.newick:
+            print(tree.newick(node_id))
+            return
+        for node in tree.subtree(node_id, args.profundidad):
+            print(f"{node['id']:>8}  hojas={node['size']:<7} altura={node['height']:.4f}  {node['label']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+import numpy as np
+
+from clustering_abstracts import preprocess_text
+
+#############################################
+# ÍNDICE INVERTIDO DE TEXTO COMPLETO (TÍTULO, ABSTRACT, KEYWORDS)
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_INDEX_FOLDER = os.path.join(SCRIPT_DIR, "cache", "indice_invertido")
+INDEXED_FIELDS = ("title", "abstract", "keywords")
+# Salto de posiciones entre campos para que una frase no cruce de un campo a otro
+FIELD_GAP = 1000
+
+QUERY_TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+
+
+def encode_varint(value, out):
+    """
+    Codifica un entero no negativo en bytes de 7 bits (varint) y lo agrega a `out`.
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(data):
+    """
+    Decodifica una secuencia de varints.
+    """
+    values, value, shift = [], 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value, shift = 0, 0
+    return values
+
+
+def article_key(article):
+    """
+    Identificador estable de un artículo: su DOI o, si no tiene, un hash de título y abstract.
+    """
+    doi = str(article.get("doi", "")).strip()
+    if doi and doi not in ("Unknown", "No DOI"):
+        return doi
+    text = f"{article.get('title', '')}\n{article.get('abstract', '')}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def article_tokens(article):
+    """
+    Tokens normalizados (misma normalización que preprocess_text) con su posición;
+    cada campo empieza FIELD_GAP posiciones después del anterior.
+    """
+    positions = {}
+    offset = 0
+    for field in INDEXED_FIELDS:
+        value = article.get(field, "")
+        if isinstance(value, (list, tuple)):
+            value = " ".join(map(str, value))
+        words = preprocess_text(str(value or "")).split()
+        for position, word in enumerate(words):
+            positions.setdefault(word, []).append(offset + position)
+        offset += len(words) + FIELD_GAP
+    return positions
+
+
+class InvertedIndex:
+    """
+    Índice invertido posicional con listas de postings comprimidas: por cada documento
+    se guarda (delta de id, frecuencia, deltas de posiciones) codificados como varints.
+    Admite consultas booleanas (AND, OR, NOT, paréntesis) y frases entre comillas, y
+    se actualiza agregando sólo los artículos nuevos.
+    """
+
+    def __init__(self, folder=SEARCH_INDEX_FOLDER):
+        self.folder = folder
+        self.blob_path = os.path.join(folder, "postings.bin")
+        self.meta_path = os.path.join(folder, "lexicon.json")
+        self.lexicon = {}   # término -> [offset, longitud, df, último documento]
+        self.blob = b""
+        self.pending = {}   # término -> postings modificados desde la última carga
+        self.keys, self.dois, self.titles = [], [], []
+        if os.path.exists(self.blob_path) and os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self.blob_path, "rb") as f:
+                self.blob = f.read()
+            self.lexicon = meta["lexicon"]
+            self.keys, self.dois, self.titles = meta["keys"], meta["dois"], meta["titles"]
+        self.known = set(self.keys)
+
+    def _raw_postings(self, term):
+        if term in self.pending:
+            return self.pending[term]
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return b""
+        offset, length = entry[0], entry[1]
+        return self.blob[offset:offset + length]
+
+    def add_articles(self, articles):
+        """
+        Indexa los artículos que aún no están en el índice. Retorna cuántos se agregaron.
+        Los ids de documento son crecientes, así que los postings sólo se extienden al final.
+        """
+        added = 0
+        for article in articles:
+            key = article_key(article)
+            if key in self.known:
+                continue
+            doc_id = len(self.keys)
+            self.keys.append(key)
+            self.dois.append(article.get("doi", "Unknown"))
+            self.titles.append(article.get("title", "Unknown"))
+            self.known.add(key)
+            added += 1
+            for term, positions in article_tokens(article).items():
+                entry = self.lexicon.setdefault(term, [0, 0, 0, -1])
+                postings = self.pending.get(term)
+                if postings is None:
+                    postings = bytearray(self._raw_postings(term)) if entry[2] else bytearray()
+                    self.pending[term] = postings
+                encode_varint(doc_id - entry[3] - 1 if entry[3] >= 0 else doc_id, postings)
+                encode_varint(len(positions), postings)
+                previous = 0
+                for position in positions:
+                    encode_varint(position - previous, postings)
+                    previous = position
+                entry[2] += 1
+                entry[3] = doc_id
+        return added
+
+    def save(self):
+        """
+        Reescribe el archivo de postings y el léxico (términos, offsets, df, documentos).
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        blob = bytearray()
+        for term in sorted(self.lexicon):
+            postings = self._raw_postings(term)
+            self.lexicon[term][0] = len(blob)
+            self.lexicon[term][1] = len(postings)
+            blob.extend(postings)
+        self.blob = bytes(blob)
+        self.pending = {}
+        with open(self.blob_path + ".tmp", "wb") as f:
+            f.write(self.blob)
+        with open(self.meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"lexicon": self.lexicon, "keys": self.keys, "dois": self.dois, "titles": self.titles}, f, ensure_ascii=False)
+        os.replace(self.blob_path + ".tmp", self.blob_path)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+        print(f"Índice invertido guardado en: {self.folder} ({len(self.keys)} artículos, {len(self.lexicon)} términos)")
+
+    def postings(self, term, with_positions=False):
+        """
+        Decodifica los postings de un término: arreglo de ids de documento o, con
+        with_positions=True, diccionario documento -> posiciones.
+        """
+        values = decode_varints(self._raw_postings(term))
+        docs, positions = [], {}
+        i, doc = 0, -1
+        while i < len(values):
+            doc = values[i] if doc < 0 else doc + values[i] + 1
+            tf = values[i + 1]
+            docs.append(doc)
+            if with_positions:
+                positions[doc] = np.cumsum(values[i + 2:i + 2 + tf]).tolist()
+            i += 2 + tf
+        return positions if with_positions else np.array(docs, dtype=np.int64)
+
+    def phrase(self, words):
+        """
+        Documentos donde las palabras aparecen consecutivas y en orden.
+        """
+        if len(words) == 1:
+            return self.postings(words[0])
+        lists = [self.postings(word, with_positions=True) for word in words]
+        docs = set(lists[0])
+        for postings in lists[1:]:
+            docs &= set(postings)
+        matches = []
+        for doc in sorted(docs):
+            starts = set(lists[0][doc])
+            for offset, postings in enumerate(lists[1:], start=1):
+                starts &= {p - offset for p in postings[doc]}
+                if not starts:
+                    break
+            if starts:
+                matches.append(doc)
+        return np.array(matches, dtype=np.int64)
+
+    def search(self, query):
+        """
+        Evalúa una consulta booleana. Ejemplos:
+            computational AND (thinking OR abstraction)
+            "computational thinking" NOT survey
+        Términos consecutivos sin operador se combinan con AND.
+        Retorna los ids de documento ordenados.
+        """
+        tokens = QUERY_TOKEN.findall(query)
+        position = 0
+        all_docs = np.arange(len(self.keys), dtype=np.int64)
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def advance():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            result = parse_and()
+            while peek() == "OR":
+                advance()
+                result = np.union1d(result, parse_and())
+            return result
+
+        def parse_and():
+            result = parse_not()
+            while peek() is not None and peek() not in ("OR", ")"):
+                if peek() == "AND":
+                    advance()
+                result = np.intersect1d(result, parse_not(), assume_unique=True)
+            return result
+
+        def parse_not():
+            if peek() == "NOT":
+                advance()
+                return np.setdiff1d(all_docs, parse_not(), assume_unique=True)
+            return parse_atom()
+
+        def parse_atom():
+            token = advance() if peek() is not None else None
+            if token is None:
+                raise ValueError("Consulta incompleta.")
+            if token == "(":
+                result = parse_or()
+                if peek() != ")":
+                    raise ValueError("Falta cerrar un paréntesis.")
+                advance()
+                return result
+            words = preprocess_text(token.strip('"')).split()
+            if not words:
+                return all_docs
+            return self.phrase(words)
+
+        result = parse_or()
+        if peek() is not None:
+            raise ValueError(f"Símbolo inesperado en la consulta: {peek()}")
+        return result
+
+    def search_articles(self, query):
+        """
+        Retorna (doi, título) de los artículos que cumplen la consulta.
+        """
+        return [(self.dois[doc], self.titles[doc]) for doc in self.search(query)]
+
+    def search_keys(self, query):
+        """
+        Claves (DOI o hash) de los artículos que cumplen la consulta, para filtrar el
+        corpus antes del clustering o del ordenamiento (ver article_key).
+        """
+        return {self.keys[doc] for doc in self.search(query)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de texto completo en processed_articles.json.")
+    parser.add_argument("consulta", nargs="?", help='Ej.: "computational thinking" AND NOT survey')
+    parser.add_argument("--actualizar", action="store_true", help="Indexa los artículos nuevos del JSON.")
+    args = parser.parse_args()
+
+    index = InvertedIndex()
+    if args.actualizar or not index.keys:
+        json_filepath = os.path.join(SCRIPT_DIR, "processed_articles.json")
+        with open(json_filepath, "r", encoding="utf-8") as f:
+            articles = json.load(f)
+        added = index.add_articles(articles)
+        print(f"Artículos nuevos indexados: {added}")
+        index.save()
+
+    if args.consulta:
+        results = index.search_articles(args.consulta)
+        print(f"{len(results)} artículos encontrados.")
+        for doi, title in results:
+            print(f"{doi}  {title}")
+
+
+if __name__ == "__main__":
+    main()
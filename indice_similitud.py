@@ -0,0 +1,140 @@
+import os
+import json
+import heapq
+import argparse
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from clustering_abstracts import preprocess_text, preprocess_texts
+
+#############################################
+# CONSULTAS TOP-K DE ARTÍCULOS SIMILARES
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FOLDER = os.path.join(SCRIPT_DIR, "cache", "similitud")
+DEFAULT_TOP_K = 10
+# En la generación de candidatos se ignoran los términos presentes en más de esta fracción
+# de documentos (aportan poco a la similitud y harían que todo el corpus fuera candidato)
+MAX_CANDIDATE_DF = 0.10
+
+
+class SimilarityIndex:
+    """
+    Índice persistente sobre los vectores TF-IDF del clustering (filas normalizadas L2).
+    Responde consultas de similitud coseno top-k con productos matriz dispersa-vector y
+    un heap acotado, opcionalmente restringidas a los candidatos del índice invertido
+    (documentos que comparten algún término poco frecuente con la consulta).
+    """
+
+    def __init__(self, X, terms, idf, dois):
+        self.X = sparse.csr_matrix(X, dtype=np.float32)
+        self.terms = list(terms)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.dois = list(dois)
+        self.vocabulary = {term: col for col, term in enumerate(self.terms)}
+        self.row_of_doi = {doi: row for row, doi in enumerate(self.dois)}
+        # Índice invertido: término -> documentos que lo contienen
+        self.postings = self.X.T.tocsr()
+        self.analyzer = TfidfVectorizer(stop_words="english").build_analyzer()
+
+    @classmethod
+    def from_documents(cls, abstracts, dois):
+        """
+        Ajusta TF-IDF sobre los abstracts (igual que el clustering) y construye el índice.
+        """
+        vectorizer = TfidfVectorizer(stop_words="english", dtype=np.float32)
+        X = vectorizer.fit_transform(preprocess_texts(abstracts))
+        return cls(X, vectorizer.get_feature_names_out(), vectorizer.idf_, dois)
+
+    def save(self, folder=INDEX_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "matriz.npz"), "wb") as f:
+            np.savez(f, data=self.X.data, indices=self.X.indices, indptr=self.X.indptr,
+                     shape=np.array(self.X.shape), idf=self.idf)
+        with open(os.path.join(folder, "metadatos.json"), "w", encoding="utf-8") as f:
+            json.dump({"terms": self.terms, "dois": self.dois}, f, ensure_ascii=False)
+        print(f"Índice de similitud guardado en: {folder}")
+
+    @classmethod
+    def load(cls, folder=INDEX_FOLDER):
+        stored = np.load(os.path.join(folder, "matriz.npz"))
+        X = sparse.csr_matrix((stored["data"], stored["indices"], stored["indptr"]), shape=tuple(stored["shape"]))
+        with open(os.path.join(folder, "metadatos.json"), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        return cls(X, metadata["terms"], stored["idf"], metadata["dois"])
+
+    def vectorize(self, abstract):
+        """
+        Vector TF-IDF (1 x términos, normalizado) de un abstract nuevo con el vocabulario
+        y el IDF del índice. Los términos desconocidos se ignoran.
+        """
+        counts = {}
+        for token in self.analyzer(preprocess_text(abstract)):
+            col = self.vocabulary.get(token)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[cols]
+        vector = sparse.csr_matrix((values, cols, [0, len(cols)]), shape=(1, len(self.terms)))
+        return normalize(vector)
+
+    def _candidates(self, vector):
+        max_df = max(1, int(MAX_CANDIDATE_DF * self.X.shape[0]))
+        lists = []
+        for col in vector.indices:
+            start, end = self.postings.indptr[col], self.postings.indptr[col + 1]
+            if end - start <= max_df:
+                lists.append(self.postings.indices[start:end])
+        if not lists:
+            return None
+        return np.unique(np.concatenate(lists))
+
+    def query_vector(self, vector, k=DEFAULT_TOP_K, exclude=None, use_candidates=True):
+        """
+        Retorna los k documentos más similares a `vector` como lista de (doi, similitud).
+        """
+        rows = self._candidates(vector) if use_candidates else None
+        if rows is None:
+            scores = (self.X @ vector.T).toarray().ravel()
+            rows = np.arange(self.X.shape[0])
+        else:
+            scores = (self.X[rows] @ vector.T).toarray().ravel()
+        best = heapq.nlargest(
+            k,
+            ((score, row) for score, row in zip(scores.tolist(), rows.tolist()) if score > 0 and row != exclude),
+        )
+        return [(self.dois[row], score) for score, row in best]
+
+    def query_abstract(self, abstract, k=DEFAULT_TOP_K, use_candidates=True):
+        return self.query_vector(self.vectorize(abstract), k, use_candidates=use_candidates)
+
+    def query_doi(self, doi, k=DEFAULT_TOP_K, use_candidates=True):
+        row = self.row_of_doi.get(doi)
+        if row is None:
+            raise KeyError(f"El DOI {doi} no está en el índice.")
+        return self.query_vector(self.X[row], k, exclude=row, use_candidates=use_candidates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artículos más similares a un DOI o a un abstract.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--doi")
+    group.add_argument("--texto")
+    parser.add_argument("-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--exacto", action="store_true", help="Evalúa todo el corpus, sin candidatos.")
+    args = parser.parse_args()
+
+    index = SimilarityIndex.load()
+    if args.doi:
+        results = index.query_doi(args.doi, args.k, use_candidates=not args.exacto)
+    else:
+        results = index.query_abstract(args.texto, args.k, use_candidates=not args.exacto)
+    for doi, score in results:
+        print(f"{score:.4f}  {doi}")
+
+
+if __name__ == "__main__":
+    main()
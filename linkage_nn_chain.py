@@ -0,0 +1,250 @@
+import os
+import tempfile
+import numpy as np
+
+from clustering_abstracts import condensed_offset, condensed_size
+from distancias_paralelas import fill_condensed_parallel
+
+#############################################
+# LINKAGE SOBRE MATRIZ CONDENSADA EN DISCO (NEAREST-NEIGHBOR CHAIN)
+#############################################
+
+SUPPORTED_METHODS = ("average", "complete", "ward")
+# Disposición del archivo de distancias: "condensed" (n(n-1)/2 elementos, el mínimo de
+# disco) o "square" (n x n: el doble de disco, pero cada fila es un bloque contiguo)
+MEMMAP_LAYOUT = "condensed"
+
+
+def n_from_condensed(m):
+    """
+    Recupera el número de observaciones n a partir del tamaño n(n-1)/2 del vector condensado.
+    """
+    n = int(np.ceil(np.sqrt(2 * m)))
+    if condensed_size(n) != m:
+        raise ValueError(f"El tamaño {m} no corresponde a un vector de distancias condensado.")
+    return n
+
+
+def row_positions(n, i, ks):
+    """
+    Posiciones en el vector condensado de las distancias d(i, k) para cada k de `ks` (k != i).
+    """
+    ks = np.asarray(ks, dtype=np.int64)
+    positions = np.empty_like(ks)
+    lower = ks < i
+    kl = ks[lower]
+    positions[lower] = n * kl - kl * (kl + 1) // 2 + (i - kl - 1)
+    positions[~lower] = condensed_offset(n, i) + (ks[~lower] - i - 1)
+    return positions
+
+
+def _read_row(dist, n, x, others):
+    """
+    Distancias d(x, k) para cada k de `others`. En la matriz cuadrada la fila x es un
+    solo bloque contiguo del archivo; en el vector condensado, las d(k, x) con k < x
+    están repartidas por todo el vector (una por cada fila anterior).
+    """
+    if dist.ndim == 2:
+        return np.asarray(dist[x], dtype=np.float64)[others]
+    return np.asarray(dist[row_positions(n, x, others)], dtype=np.float64)
+
+
+def _write_row(dist, n, y, others, values):
+    if dist.ndim == 2:
+        dist[y, others] = values
+        dist[others, y] = values
+    else:
+        dist[row_positions(n, y, others)] = values
+
+
+def lance_williams_update(method, d_kx, d_ky, d_xy, size_x, size_y, size_k):
+    """
+    Distancia del cluster k al cluster resultante de unir x e y (fórmula de Lance-Williams),
+    con la misma convención que scipy para Ward (distancias, no distancias al cuadrado).
+    """
+    if method == "average":
+        return (size_x * d_kx + size_y * d_ky) / (size_x + size_y)
+    if method == "complete":
+        return np.maximum(d_kx, d_ky)
+    total = size_x + size_y + size_k
+    value = ((size_k + size_x) * d_kx ** 2 + (size_k + size_y) * d_ky ** 2 - size_k * d_xy ** 2) / total
+    return np.sqrt(np.maximum(value, 0.0))
+
+
+def label_merges(merges, n):
+    """
+    Ordena las uniones por altura (de forma estable) y las renumera con la convención
+    de scipy: las hojas son 0..n-1 y el cluster creado en el paso i recibe el id n+i.
+    `merges` contiene filas (representante_a, representante_b, distancia).
+    """
+    order = np.argsort(merges[:, 2], kind="mergesort")
+    parent = np.arange(2 * n - 1)
+    counts = np.ones(2 * n - 1, dtype=np.int64)
+    linkage_matrix = np.empty((n - 1, 4), dtype=np.float64)
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for step, idx in enumerate(order):
+        a, b, dist = merges[idx]
+        root_a, root_b = find(int(a)), find(int(b))
+        new_id = n + step
+        parent[root_a] = parent[root_b] = new_id
+        counts[new_id] = counts[root_a] + counts[root_b]
+        linkage_matrix[step] = (min(root_a, root_b), max(root_a, root_b), dist, counts[new_id])
+    return linkage_matrix
+
+
+def nn_chain_linkage(dist_vector, method="average"):
+    """
+    Linkage jerárquico (average, complete o ward) con el algoritmo nearest-neighbor chain.
+    Trabaja directamente sobre las distancias, que pueden ser un numpy.memmap: el vector
+    condensado o la matriz cuadrada n x n (la que usa memmap_linkage, en la que cada
+    lectura de fila es secuencial). Sólo se mantienen en RAM una fila de distancias y
+    los arreglos de tamaño n.
+    ATENCIÓN: las distancias se sobrescriben con los valores actualizados.
+    Retorna una matriz de linkage estándar de scipy.
+    """
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Método de linkage no soportado: {method}")
+    n = dist_vector.shape[0] if dist_vector.ndim == 2 else n_from_condensed(len(dist_vector))
+    sizes = np.ones(n, dtype=np.float64)
+    active = np.ones(n, dtype=bool)
+    merges = np.empty((n - 1, 3), dtype=np.float64)
+    chain = []
+
+    for step in range(n - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        while True:
+            x = chain[-1]
+            others = np.flatnonzero(active)
+            others = others[others != x]
+            row = _read_row(dist_vector, n, x, others)
+            best = int(np.argmin(row))
+            y, d_xy = int(others[best]), row[best]
+            if len(chain) > 1:
+                # En caso de empate se prefiere el elemento anterior de la cadena
+                prev = chain[-2]
+                d_prev = row[np.searchsorted(others, prev)]
+                if d_prev <= d_xy:
+                    y, d_xy = prev, d_prev
+                if y == prev:
+                    break
+            chain.append(y)
+
+        chain.pop()
+        chain.pop()
+        merges[step] = (x, y, d_xy)
+
+        # El nuevo cluster ocupa la posición de y; x queda inactivo
+        others = np.flatnonzero(active)
+        others = others[(others != x) & (others != y)]
+        if len(others):
+            d_kx = _read_row(dist_vector, n, x, others)
+            d_ky = _read_row(dist_vector, n, y, others)
+            updated = lance_williams_update(method, d_kx, d_ky, d_xy, sizes[x], sizes[y], sizes[others])
+            _write_row(dist_vector, n, y, others, updated)
+        active[x] = False
+        sizes[y] += sizes[x]
+
+    return label_merges(merges, n)
+
+
+def create_condensed_memmap(n, path):
+    """
+    Crea en disco un vector condensado float32 de n(n-1)/2 elementos respaldado por numpy.memmap.
+    """
+    return np.memmap(path, dtype=np.float32, mode="w+", shape=(condensed_size(n),))
+
+
+def create_square_memmap(n, path):
+    """
+    Crea en disco una matriz float32 n x n (por filas) respaldada por numpy.memmap.
+    """
+    return np.memmap(path, dtype=np.float32, mode="w+", shape=(n, n))
+
+
+def memmap_linkage(X, method="average", folder=None, layout=MEMMAP_LAYOUT):
+    """
+    Calcula las distancias coseno de la matriz TF-IDF (en paralelo, por bloques) en un
+    archivo temporal en disco y ejecuta el linkage nearest-neighbor chain sobre él. El archivo se elimina al terminar.
+    Con layout="condensed" (por defecto) el archivo ocupa lo mínimo, pero cada lectura o
+    escritura de una fila toca una página por cada fila anterior: mientras el archivo
+    quepa en la caché de páginas eso no importa; si no cabe, el tiempo pasa a depender de
+    la lectura aleatoria del disco. layout="square" usa el doble de disco (y calcula cada
+    par dos veces) a cambio de que las lecturas de fila sean secuenciales; la copia
+    simétrica de la fila actualizada sigue tocando una página por fila activa.
+    """
+    if layout not in ("condensed", "square"):
+        raise ValueError(f"Disposición no soportada: {layout}")
+    fd, path = tempfile.mkstemp(suffix=".dist", dir=folder)
+    os.close(fd)
+    try:
+        if layout == "square":
+            dist_vector = create_square_memmap(X.shape[0], path)
+        else:
+            dist_vector = create_condensed_memmap(X.shape[0], path)
+        dist_vector.flush()
+        fill_condensed_parallel(X, ("square_memmap" if layout == "square" else "memmap", path))
+        linkage_matrix = nn_chain_linkage(dist_vector, method)
+        del dist_vector
+    finally:
+        os.remove(path)
+    return linkage_matrix
+
+
+def ward_nn_chain_vectors(Y, weights=None):
+    """
+    Linkage de Ward (convención de scipy) sobre vectores densos con nearest-neighbor chain.
+    Sólo guarda el centroide y el peso de cada cluster, por lo que la memoria es O(n·k)
+    en lugar de O(n²). `weights` permite dar a cada fila el peso de varios documentos
+    (por ejemplo, el tamaño de un micro-cluster); la columna de tamaños de la matriz de
+    linkage sigue contando hojas.
+    """
+    centroids = np.array(Y, dtype=np.float64)
+    n = centroids.shape[0]
+    sizes = np.ones(n, dtype=np.float64) if weights is None else np.asarray(weights, dtype=np.float64).copy()
+    active = np.ones(n, dtype=bool)
+    merges = np.empty((n - 1, 3), dtype=np.float64)
+    chain = []
+
+    def distances(x, others):
+        diff = centroids[others] - centroids[x]
+        squared = np.einsum("ij,ij->i", diff, diff)
+        factor = 2.0 * sizes[others] * sizes[x] / (sizes[others] + sizes[x])
+        return np.sqrt(factor * squared)
+
+    for step in range(n - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        while True:
+            x = chain[-1]
+            others = np.flatnonzero(active)
+            others = others[others != x]
+            row = distances(x, others)
+            best = int(np.argmin(row))
+            y, d_xy = int(others[best]), row[best]
+            if len(chain) > 1:
+                prev = chain[-2]
+                d_prev = row[np.searchsorted(others, prev)]
+                if d_prev <= d_xy:
+                    y, d_xy = prev, d_prev
+                if y == prev:
+                    break
+            chain.append(y)
+
+        chain.pop()
+        chain.pop()
+        merges[step] = (x, y, d_xy)
+        total = sizes[x] + sizes[y]
+        centroids[y] = (sizes[x] * centroids[x] + sizes[y] * centroids[y]) / total
+        sizes[y] = total
+        active[x] = False
+
+    return label_merges(merges, n)
@@ -0,0 +1,109 @@
+import time
+import multiprocessing
+import numpy as np
+
+#############################################
+# MEDICIÓN DE TIEMPOS CON REPETICIONES Y LÍMITE DE TIEMPO
+#############################################
+
+# Ejecuciones descartadas antes de medir (cachés, asignación de memoria, etc.)
+DEFAULT_WARMUP = 1
+# Ejecuciones medidas por algoritmo
+DEFAULT_REPEATS = 5
+# Tiempo máximo (segundos) de cada algoritmo, sumando calentamiento y repeticiones
+DEFAULT_TIMEOUT = 60.0
+
+
+def _run_in_child(algorithm, data, warmup, repeats, conn):
+    """
+    Se ejecuta en un proceso aparte: cada medición se envía en cuanto termina, así el
+    proceso principal conserva las repeticiones completas aunque después se agote el tiempo.
+    """
+    try:
+        for _ in range(warmup):
+            algorithm(data.copy())
+        for _ in range(repeats):
+            work = data.copy()  # La copia no se incluye en el tiempo medido
+            start = time.perf_counter_ns()
+            algorithm(work)
+            conn.send(("tiempo", time.perf_counter_ns() - start))
+        conn.send(("fin", None))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def summarize_times(times_ns):
+    """
+    Mediana, cuartiles, IQR y mínimo (en milisegundos) de una lista de tiempos en ns.
+    """
+    if not times_ns:
+        return {"mediana_ms": None, "q1_ms": None, "q3_ms": None, "iqr_ms": None, "min_ms": None}
+    values = np.asarray(times_ns, dtype=np.float64) / 1e6
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    return {
+        "mediana_ms": float(median),
+        "q1_ms": float(q1),
+        "q3_ms": float(q3),
+        "iqr_ms": float(q3 - q1),
+        "min_ms": float(values.min()),
+    }
+
+
+def measure_algorithm(algorithm, data, warmup=DEFAULT_WARMUP, repeats=DEFAULT_REPEATS, timeout=DEFAULT_TIMEOUT):
+    """
+    Mide un algoritmo de ordenamiento en un proceso aislado con time.perf_counter_ns.
+    Si el proceso supera `timeout` segundos se termina y el resultado se marca como
+    "timeout"; si lanza una excepción o muere, como "error". Nunca se reporta 0 ms.
+    Retorna un diccionario con el estado, las repeticiones medidas y mediana/IQR/mínimo.
+    """
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_run_in_child, args=(algorithm, data, warmup, repeats, child_conn), daemon=True
+    )
+    process.start()
+    child_conn.close()
+
+    times_ns, state, detail = [], None, None
+    deadline = time.monotonic() + timeout
+    try:
+        while state is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not parent_conn.poll(remaining):
+                state, detail = "timeout", f"superó {timeout:g} s"
+                break
+            try:
+                kind, value = parent_conn.recv()
+            except EOFError:
+                process.join(1)
+                state, detail = "error", f"el proceso terminó con código {process.exitcode}"
+                break
+            if kind == "tiempo":
+                times_ns.append(value)
+            elif kind == "fin":
+                state = "ok"
+            else:
+                state, detail = "error", value
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.terminate()
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+        process.join()
+
+    result = {"estado": state, "detalle": detail, "repeticiones": len(times_ns)}
+    result.update(summarize_times(times_ns))
+    return result
+
+
+def format_result(result):
+    """
+    Texto corto de un resultado para la consola.
+    """
+    if result["estado"] == "ok":
+        return (f"mediana {result['mediana_ms']:.4f} ms, IQR {result['iqr_ms']:.4f} ms, "
+                f"mínimo {result['min_ms']:.4f} ms ({result['repeticiones']} repeticiones)")
+    return f"{result['estado'].upper()}: {result['detalle']}"
@@ -0,0 +1,185 @@
+import os
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from sklearn.metrics import silhouette_score
+
+from clustering_abstracts import condensed_cosine_distances, condensed_size
+from cortes_clusters import cut_linkage_multi
+
+#############################################
+# MÉTRICAS DE CALIDAD DEL CLUSTERING (MUESTREADAS Y EN PARALELO)
+#############################################
+
+# Documentos de la muestra estratificada usada en las métricas cuadráticas
+# (correlación cofenética y silhouette): su costo no depende del tamaño del corpus
+METRIC_SAMPLE_SIZE = 2000
+# Por encima de este número de clusters no se calcula Davies–Bouldin (matriz k x k)
+MAX_DB_CLUSTERS = 5000
+
+_worker_state = {}
+
+
+def stratified_sample(labels, sample_size, seed=0):
+    """
+    Muestra estratificada por cluster de exactamente `sample_size` documentos: cada
+    cluster recibe la parte entera de su cuota proporcional y los lugares restantes se
+    reparten por mayor resto (empates al azar). Con más clusters que `sample_size`
+    (p. ej. un corte de singletons) sólo una parte de los clusters queda representada,
+    pero la muestra nunca crece con el corpus. Retorna los índices ordenados.
+    """
+    labels = np.asarray(labels)
+    n = len(labels)
+    if n <= sample_size:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n), labels))
+    _, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+    exact = counts * sample_size / n
+    quota = np.floor(exact).astype(np.int64)
+    remainder = np.lexsort((rng.random(len(counts)), quota - exact))[:sample_size - quota.sum()]
+    quota[remainder] += 1
+    rank = np.arange(n) - np.repeat(starts, counts)
+    return np.sort(order[rank < np.repeat(quota, counts)])
+
+
+def sampled_cophenetic_distances(linkage_matrix, leaf_of_doc, sample):
+    """
+    Distancias cofenéticas (altura de la primera unión que junta a los dos documentos)
+    entre los documentos de la muestra, en forma condensada. Se reproduce el orden de
+    uniones llevando sólo los documentos muestreados de cada nodo, así que el costo es
+    O(n + m²) para una muestra de m documentos. Documentos de la misma hoja quedan a 0.
+    """
+    linkage_matrix = np.asarray(linkage_matrix)
+    n = linkage_matrix.shape[0] + 1
+    m = len(sample)
+    result = np.zeros(condensed_size(m), dtype=np.float64)
+    members = {}
+    for position, doc in enumerate(sample):
+        members.setdefault(int(leaf_of_doc[doc]), []).append(position)
+
+    for step, (a, b) in enumerate(linkage_matrix[:, :2].astype(np.int64)):
+        left, right = members.pop(a, None), members.pop(b, None)
+        if left and right:
+            i = np.repeat(left, len(right))
+            j = np.tile(right, len(left))
+            i, j = np.minimum(i, j), np.maximum(i, j)
+            result[m * i - i * (i + 1) // 2 + (j - i - 1)] = linkage_matrix[step, 2]
+        if left or right:
+            members[n + step] = (left or []) + (right or [])
+    return result
+
+
+def davies_bouldin_sparse(X, labels):
+    """
+    Índice de Davies–Bouldin con centroides dispersos, en tiempo lineal en nnz(X).
+    La dispersión de cada cluster es la distancia cuadrática media a su centroide
+    (raíz), que se obtiene sin recorrer pares: sum ||x - c||² = sum ||x||² - n_c ||c||².
+    """
+    _, labels = np.unique(labels, return_inverse=True)
+    k = int(labels.max()) + 1
+    n = X.shape[0]
+    if k < 2 or k == n or k > MAX_DB_CLUSTERS:
+        return None
+    sizes = np.bincount(labels, minlength=k).astype(np.float64)
+    membership = sparse.csr_matrix((np.ones(n), (labels, np.arange(n))), shape=(k, n))
+    centroids = sparse.diags(1.0 / sizes) @ (membership @ X)
+    squared_norms = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+    gram = (centroids @ centroids.T).toarray()
+    centroid_norms = np.diag(gram)
+    scatter = np.bincount(labels, weights=squared_norms, minlength=k) / sizes - centroid_norms
+    scatter = np.sqrt(np.maximum(scatter, 0.0))
+    separation = np.sqrt(np.maximum(centroid_norms[:, None] + centroid_norms[None, :] - 2 * gram, 0.0))
+    np.fill_diagonal(separation, np.inf)
+    ratios = (scatter[:, None] + scatter[None, :]) / np.where(separation > 0, separation, np.inf)
+    np.fill_diagonal(ratios, -np.inf)
+    return float(ratios.max(axis=1).mean())
+
+
+def _init_worker(X, linkages, leaf_of_doc, cuts):
+    _worker_state.update(X=sparse.csr_matrix(X), linkages=linkages, leaf_of_doc=leaf_of_doc, cuts=cuts)
+
+
+def _cophenetic_task(method, sample):
+    state = _worker_state
+    cophenetic = sampled_cophenetic_distances(state["linkages"][method], state["leaf_of_doc"], sample)
+    distances = condensed_cosine_distances(state["X"][sample])
+    if len(cophenetic) < 2 or np.std(cophenetic) == 0 or np.std(distances) == 0:
+        return None
+    return float(np.corrcoef(cophenetic, distances)[0, 1])
+
+
+def _cut_task(method, name, sample_size):
+    state = _worker_state
+    X = state["X"]
+    labels = state["cuts"][method][name][state["leaf_of_doc"]]
+    n_clusters = int(len(np.unique(labels)))
+    sample = stratified_sample(labels, sample_size)
+    silhouette = None
+    if 2 <= len(np.unique(labels[sample])) < len(sample):
+        silhouette = float(silhouette_score(X[sample], labels[sample], metric="cosine"))
+    return {
+        "clusters": n_clusters,
+        "silhouette": silhouette,
+        "davies_bouldin": davies_bouldin_sparse(X, labels),
+    }
+
+
+def evaluate_linkages(X, linkages, leaf_of_doc=None, thresholds=(), n_clusters=(),
+                      sample_size=METRIC_SAMPLE_SIZE, max_workers=None):
+    """
+    Correlación cofenética de cada linkage y silhouette / Davies–Bouldin de cada corte.
+    Las métricas cuadráticas usan una muestra estratificada de `sample_size` documentos y
+    cada (método, corte) se evalúa como una tarea independiente en un pool de procesos
+    que recibe la matriz TF-IDF una sola vez.
+    `leaf_of_doc` indica la hoja de cada fila de X (micro-cluster en el modo en dos niveles).
+    """
+    n = X.shape[0]
+    leaf_of_doc = np.arange(n) if leaf_of_doc is None else np.asarray(leaf_of_doc)
+    cuts = {
+        method: cut_linkage_multi(linkage_matrix, thresholds=thresholds, n_clusters=n_clusters)
+        for method, linkage_matrix in linkages.items()
+    }
+    report = {method: {"cofenetica": None, "cortes": {}} for method in linkages}
+
+    tasks = max(1, len(linkages) * (1 + len(thresholds) + len(n_clusters)))
+    with ProcessPoolExecutor(
+        max_workers=max_workers or min(tasks, os.cpu_count() or 1),
+        initializer=_init_worker,
+        initargs=(X, linkages, leaf_of_doc, cuts),
+    ) as executor:
+        futures = {}
+        for method, method_cuts in cuts.items():
+            # Estratos: el corte más fino pedido, para que la muestra cubra todas las ramas
+            strata = max(method_cuts.values(), key=lambda labels: labels.max())[leaf_of_doc] if method_cuts else leaf_of_doc
+            sample = stratified_sample(strata, sample_size)
+            futures[(method, None)] = executor.submit(_cophenetic_task, method, sample)
+            for name in method_cuts:
+                futures[(method, name)] = executor.submit(_cut_task, method, name, sample_size)
+        for (method, name), future in futures.items():
+            if name is None:
+                report[method]["cofenetica"] = future.result()
+            else:
+                report[method]["cortes"][name] = future.result()
+    return report
+
+
+def best_method(report):
+    """
+    Elige el método con mayor silhouette promedio entre sus cortes (desempate:
+    correlación cofenética).
+    """
+    def score(method):
+        values = [c["silhouette"] for c in report[method]["cortes"].values() if c["silhouette"] is not None]
+        return (np.mean(values) if values else -np.inf, report[method]["cofenetica"] or -np.inf)
+
+    return max(report, key=score) if report else None
+
+
+def save_metrics(report, filename):
+    output = {"mejor_metodo": best_method(report), "metodos": report}
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"Métricas de clustering guardadas en: {filename} (mejor método: {output['mejor_metodo']})")
+    return output
@@ -0,0 +1,161 @@
+import numpy as np
+
+#############################################
+# ORDENAMIENTOS POR DISTRIBUCIÓN VECTORIZADOS CON NUMPY
+#############################################
+
+# Bits por dígito del radix sort (base 16)
+RADIX_BITS = 4
+RADIX = 1 << RADIX_BITS
+# Tamaño máximo de cubeta que se corrige con pasadas par-impar; las cubetas mayores
+# (p. ej. atributos con muchos valores repetidos) se ordenan con pasadas de radix
+BUCKET_FIXUP_LIMIT = 32
+# Elementos por bloque al calcular el rango de cada elemento dentro de su dígito
+COUNT_CHUNK = 1 << 16
+
+_SIGN_BIT = np.uint64(1 << 63)
+
+
+def _as_array(arr):
+    values = np.asarray(arr)
+    if values.dtype.kind not in "iuf":
+        values = values.astype(np.float64)
+    return values
+
+
+def _is_integral(values):
+    return values.dtype.kind in "iu" or bool(np.all(np.isfinite(values)) and np.all(values == np.floor(values)))
+
+
+def sortable_keys(values):
+    """
+    Claves uint64 con el mismo orden que los valores: los enteros se desplazan al
+    mínimo; en los float64 se invierten los bits de los negativos y se activa el bit de
+    signo de los positivos (el orden de los bits coincide con el orden numérico).
+    """
+    if _is_integral(values):
+        ints = values.astype(np.int64)
+        return (ints - ints.min()).astype(np.uint64)
+    bits = values.astype(np.float64).view(np.uint64)
+    keys = np.where(bits & _SIGN_BIT, ~bits, bits | _SIGN_BIT)
+    return keys - keys.min()
+
+
+def count_sort_np(keys, shift, order):
+    """
+    Una pasada estable de conteo sobre el dígito (keys >> shift) & (RADIX - 1):
+    histograma con bincount, posiciones iniciales con la suma acumulada y dispersión de
+    cada elemento a starts[dígito] + rango, donde el rango (cuántos elementos anteriores
+    tienen el mismo dígito) sale de la suma acumulada de la codificación one-hot de los
+    dígitos, calculada por bloques de COUNT_CHUNK elementos.
+    """
+    digits = ((keys[order] >> np.uint64(shift)) & np.uint64(RADIX - 1)).astype(np.intp)
+    counts = np.bincount(digits, minlength=RADIX)
+    if counts.max() == len(order):
+        return order  # Dígito constante: la pasada no cambia el orden
+    next_position = np.cumsum(counts) - counts
+    positions = np.empty(len(order), dtype=np.intp)
+    radix_values = np.arange(RADIX)
+    for lo in range(0, len(order), COUNT_CHUNK):
+        chunk = digits[lo:lo + COUNT_CHUNK]
+        one_hot = chunk[:, None] == radix_values
+        seen = np.cumsum(one_hot, axis=0, dtype=np.intp)
+        positions[lo:lo + len(chunk)] = next_position[chunk] + seen[np.arange(len(chunk)), chunk] - 1
+        next_position += seen[-1]
+    result = np.empty_like(order)
+    result[positions] = order
+    return result
+
+
+def radix_order(keys):
+    """
+    Permutación que ordena las claves uint64 (LSD radix, base RADIX). Sólo se recorren
+    los dígitos hasta el más significativo de la clave máxima.
+    """
+    order = np.arange(len(keys))
+    if len(keys) == 0:
+        return order
+    max_key = int(keys.max())
+    shift = 0
+    while shift < 64 and (max_key >> shift) > 0:
+        order = count_sort_np(keys, shift, order)
+        shift += RADIX_BITS
+    return order
+
+
+def radix_sort_np(arr):
+    """
+    Radix sort vectorizado: extrae los dígitos de todas las claves a la vez en lugar de
+    usar // y % por elemento. Admite enteros y floats (incluidos negativos).
+    """
+    values = _as_array(arr)
+    if len(values) == 0:
+        return values
+    return values[radix_order(sortable_keys(values))]
+
+
+def pigeonhole_sort_np(arr):
+    """
+    Pigeonhole sort vectorizado: cuenta cada valor con bincount y reconstruye la salida
+    con repeat. Requiere valores enteros; si no lo son, se ordena con radix_sort_np.
+    """
+    values = _as_array(arr)
+    if len(values) == 0:
+        return values
+    if not _is_integral(values):
+        return radix_sort_np(values)
+    ints = values.astype(np.int64)
+    min_val = ints.min()
+    holes = np.bincount(ints - min_val)
+    return np.repeat(np.arange(len(holes), dtype=np.int64) + min_val, holes).astype(values.dtype)
+
+
+def bucket_sort_np(arr):
+    """
+    Bucket sort vectorizado con las mismas cubetas que bucket_sort (n cubetas de igual
+    ancho). Los elementos se dispersan a sus cubetas con un conteo estable y el orden
+    dentro de cada cubeta se corrige con pasadas par-impar vectorizadas, que terminan en
+    tantas pasadas como elementos tenga la cubeta más grande. Las cubetas con más de
+    BUCKET_FIXUP_LIMIT elementos se ordenan antes con radix_order sobre sus valores: como
+    las cubetas son intervalos crecientes de valores, ordenar juntos todos sus elementos
+    deja cada uno en su propio segmento.
+    """
+    values = _as_array(arr)
+    n = len(values)
+    if n <= 1:
+        return values.copy()
+    min_val, max_val = values.min(), values.max()
+    buckets = (n * (values - min_val) / (max_val - min_val + 1)).astype(np.int64)
+    order = radix_order(buckets.astype(np.uint64))
+    values, buckets = values[order], buckets[order]
+
+    sizes = np.bincount(buckets)
+    large = sizes[buckets] > BUCKET_FIXUP_LIMIT
+    if large.any():
+        crowded = values[large]
+        values[large] = crowded[radix_order(sortable_keys(crowded))]
+    largest = int(sizes[sizes <= BUCKET_FIXUP_LIMIT].max(initial=0))
+    for _ in range(largest):
+        swapped = False
+        for start in (0, 1):
+            i = np.arange(start, n - 1, 2)
+            swap = i[(buckets[i] == buckets[i + 1]) & (values[i] > values[i + 1])]
+            if len(swap):
+                values[swap], values[swap + 1] = values[swap + 1], values[swap].copy()
+                swapped = True
+        if not swapped:
+            break
+    return values
+
+
+# Algoritmos que reciben un arreglo NumPy: convertir una lista dentro de la región medida
+# mediría la conversión y no el ordenamiento
+VECTORIZED_SORTS = (pigeonhole_sort_np, bucket_sort_np, radix_sort_np)
+
+
+def sort_input(algorithm, values):
+    """
+    Entrada de un algoritmo a partir del arreglo de claves: copia del arreglo para los
+    ordenamientos vectorizados y lista de Python para los demás.
+    """
+    return np.array(values) if algorithm in VECTORIZED_SORTS else np.asarray(values).tolist()
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from medicion_tiempos import format_result, measure_algorithm
+from ordenamiento_vectorizado import sort_input
+
+#############################################
+# EJECUCIÓN EN PARALELO DE LA MATRIZ ALGORITMO x VARIABLE
+#############################################
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_FILE = os.path.join(SCRIPT_DIR, "resultados", "reporte_ordenamiento.json")
+
+_worker_state = {}
+
+
+def available_cpus():
+    """
+    Núcleos en los que este proceso puede ejecutarse (o todos, si el sistema no lo informa).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _share_variables(variables):
+    """
+    Copia los datos procesados de cada variable a memoria compartida.
+    Retorna (segmentos a liberar, variable -> (nombre, longitud, dtype)).
+    """
+    segments, layout = [], {}
+    for variable, (data, _) in variables.items():
+        values = np.asarray(data)
+        if values.dtype.kind not in "iuf":
+            raise TypeError(f"La variable {variable} no es numérica ({values.dtype}).")
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        segments.append(shm)
+        layout[variable] = (shm.name, len(values), values.dtype.str)
+    return segments, layout
+
+
+def _init_worker(algorithms_funcs, layout, cpu_queue):
+    """
+    Fija el proceso a un núcleo propio (los procesos de medición lo heredan) y se
+    conecta a los datos compartidos de todas las variables.
+    """
+    if cpu_queue is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu_queue.get()})
+    _worker_state["algorithms"] = algorithms_funcs
+    _worker_state["segments"] = {}
+    for variable, (name, length, dtype) in layout.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_state["segments"][variable] = (shm, np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf))
+
+
+def _grid_task(algo_name, variable):
+    # Los algoritmos puros de Python reciben una lista (como en la ejecución secuencial)
+    # y los vectorizados una copia del arreglo
+    algorithm = _worker_state["algorithms"][algo_name]
+    data = sort_input(algorithm, _worker_state["segments"][variable][1])
+    return measure_algorithm(algorithm, data)
+
+
+def run_benchmark_grid(algorithms_funcs, variables, max_workers=None, cpus=None, report_file=REPORT_FILE):
+    """
+    Mide cada par (algoritmo, variable) en un pool de procesos. Cada proceso queda fijado
+    a un núcleo distinto y hay como máximo `max_workers` mediciones simultáneas, para que
+    no compitan entre sí. Los datos de las variables (variable -> (datos procesados,
+    etiqueta)) se publican una vez en memoria compartida en lugar de enviarse en cada tarea.
+    Escribe un solo reporte JSON y retorna variable -> algoritmo -> resultado.
+    """
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    tasks = [(algo_name, variable) for variable in variables for algo_name in algorithms_funcs]
+    max_workers = max(1, min(max_workers or len(cpus), len(cpus), len(tasks) or 1))
+
+    cpu_queue = None
+    if hasattr(os, "sched_setaffinity"):
+        cpu_queue = multiprocessing.Queue()
+        for cpu in cpus[:max_workers]:
+            cpu_queue.put(cpu)
+
+    results = {variable: {} for variable in variables}
+    segments, layout = _share_variables(variables)
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(algorithms_funcs, layout, cpu_queue),
+        ) as executor:
+            futures = {executor.submit(_grid_task, *task): task for task in tasks}
+            for future in as_completed(futures):
+                algo_name, variable = futures[future]
+                results[variable][algo_name] = future.result()
+                print(f"Tiempo de {algo_name} para {variable}: {format_result(results[variable][algo_name])}")
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+    report = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "trabajadores": max_workers,
+        "cpus": cpus[:max_workers],
+        "segundos_totales": time.perf_counter() - start,
+        "resultados": [
+            dict(algoritmo=algo_name, variable=variable, tipo=variables[variable][1],
+                 elementos=len(variables[variable][0]), **results[variable][algo_name])
+            for variable in variables
+            for algo_name in algorithms_funcs
+        ],
+    }
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Reporte de tiempos guardado en: {report_file}")
+    return results
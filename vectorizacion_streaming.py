@@ -0,0 +1,134 @@
+import json
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from clustering_abstracts import preprocess_texts
+from cache_tfidf import abstract_hash
+
+#############################################
+# VECTORIZACIÓN EN STREAMING CON HASHING (MEMORIA ACOTADA)
+#############################################
+
+# Número de abstracts vectorizados por lote
+STREAMING_BATCH_SIZE = 10000
+# Dimensión del espacio de hashing (el vocabulario nunca se materializa)
+HASHING_FEATURES = 2 ** 18
+READ_CHUNK_SIZE = 1 << 20
+
+
+def iter_json_array(json_filepath, chunk_size=READ_CHUNK_SIZE):
+    """
+    Recorre perezosamente los elementos de un archivo JSON cuyo nivel superior es una lista,
+    leyendo el archivo por bloques en lugar de cargarlo completo con json.load.
+    """
+    decoder = json.JSONDecoder()
+    with open(json_filepath, "r", encoding="utf-8") as f:
+        buffer = ""
+        eof = False
+        started = False
+
+        def read_more():
+            nonlocal buffer, eof
+            chunk = f.read(chunk_size)
+            if chunk:
+                buffer += chunk
+            else:
+                eof = True
+
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                if eof:
+                    raise ValueError("El archivo JSON terminó antes de cerrar la lista.")
+                read_more()
+                continue
+            if not started:
+                if buffer[0] != "[":
+                    raise ValueError("Se esperaba una lista JSON en el nivel superior.")
+                buffer = buffer[1:]
+                started = True
+                continue
+            if buffer[0] == "]":
+                return
+            if buffer[0] == ",":
+                buffer = buffer[1:]
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            yield item
+            buffer = buffer[end:]
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_hashing_tfidf(json_filepath, batch_size=STREAMING_BATCH_SIZE, n_features=HASHING_FEATURES):
+    """
+    Lee processed_articles.json de forma perezosa y vectoriza los abstracts por lotes con
+    HashingVectorizer, acumulando la frecuencia de documentos de cada columna para
+    calcular el IDF al final (mismo IDF suavizado que TfidfVectorizer).
+    Retorna (matriz TF-IDF dispersa float32 normalizada L2, metadatos de cada fila:
+    doi, title y hash del abstract).
+    La memoria es proporcional a los elementos no nulos y a `n_features`, no al vocabulario.
+    """
+    vectorizer = HashingVectorizer(
+        n_features=n_features,
+        alternate_sign=False,
+        norm=None,
+        stop_words="english",
+        dtype=np.float32,
+    )
+    document_frequency = np.zeros(n_features, dtype=np.int64)
+    blocks, metadata = [], []
+
+    articles = (article for article in iter_json_array(json_filepath) if article.get("abstract", "").strip())
+    for batch in _batches(articles, batch_size):
+        abstracts = [article["abstract"] for article in batch]
+        counts = vectorizer.transform(preprocess_texts(abstracts)).tocsr()
+        counts.sum_duplicates()
+        document_frequency += np.bincount(counts.indices, minlength=n_features)
+        blocks.append(counts)
+        metadata.extend(
+            {"doi": article.get("doi", "Unknown"), "title": article.get("title", "Unknown"), "hash": abstract_hash(ab)}
+            for article, ab in zip(batch, abstracts)
+        )
+        print(f"Streaming: {len(metadata)} abstracts vectorizados.")
+
+    if not blocks:
+        return sparse.csr_matrix((0, n_features), dtype=np.float32), metadata
+
+    n_docs = len(metadata)
+    idf = (np.log((1.0 + n_docs) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+    X = sparse.vstack(blocks, format="csr")
+    del blocks
+    X = X @ sparse.diags(idf)
+    return normalize(X.tocsr()).astype(np.float32), metadata
+
+
+def fold_hashed_features(X, n_features):
+    """
+    Reduce la matriz TF-IDF con hashing a `n_features` columnas (potencia de 2 menor que la
+    dimensión original) sumando las columnas con el mismo índice módulo `n_features`:
+    equivale a haber usado HashingVectorizer con n_features columnas. Las filas se vuelven
+    a normalizar (L2).
+    """
+    if X.shape[1] <= n_features:
+        return X
+    folded = sparse.csr_matrix((X.data, X.indices % n_features, X.indptr), shape=(X.shape[0], n_features))
+    folded.sum_duplicates()
+    return normalize(folded).astype(np.float32)